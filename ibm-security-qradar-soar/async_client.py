@@ -0,0 +1,173 @@
+"""
+Copyright start
+MIT License
+Copyright (c) 2025 Fortinet Inc
+Copyright end
+"""
+
+import asyncio, time
+from connectors.core.connector import get_logger, ConnectorError
+from .operations import (IBMResilient, INCIDENT_SECTIONS, ARTIFACT_PAGE_SIZE, SESSION_POOL_MAXSIZE, TRANSPORT_ERRORS,
+                         check_payload, json_dumps, get_token_bucket, cache_invalidate)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = get_logger('ibm-security-qradar-soar')
+
+
+def is_available():
+    return httpx is not None
+
+
+def _is_tls_error(err):
+    # httpx reports certificate failures as ConnectError carrying the ssl module's message
+    message = str(err).upper()
+    return 'SSL' in message or 'CERTIFICATE' in message
+
+
+class IBMResilientAsync(object):
+    """
+    asyncio counterpart of IBMResilient built on httpx. Caching, retries, metrics and errors go through the
+    request policy methods of IBMResilient, so one event loop can keep many requests in flight without a
+    thread per request and still behave like the blocking client.
+    """
+
+    def __init__(self, config, concurrency=SESSION_POOL_MAXSIZE):
+        if httpx is None:
+            raise ConnectorError("The httpx package is required to use the asynchronous client.")
+        self.ir = IBMResilient(config)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.client = httpx.AsyncClient(auth=(self.ir.api_key, self.ir.api_secret), verify=self.ir.verify_ssl,
+                                        headers={'Content-Type': 'application/json'}, timeout=None,
+                                        limits=httpx.Limits(max_connections=concurrency))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def make_rest_call(self, endpoint, method, data=None, params=None):
+        ir = self.ir
+        url = ir.url + endpoint
+        started = time.monotonic()
+        cached, cache_key, invalidate_prefix = ir.check_cache(endpoint, method, params)
+        if cached is not None:
+            return cached
+        idempotent = ir.is_idempotent(endpoint, method)
+        try:
+            async with self.semaphore:
+                attempt = 0
+                while True:
+                    await self._acquire_token()
+                    sent = time.monotonic()
+                    try:
+                        # Streamed so that the time until the headers arrived can be told from the body transfer
+                        response = await self.client.send(self.client.build_request(method, url, content=data,
+                                                                                    params=params), stream=True)
+                        server_response = time.monotonic() - sent
+                        await response.aread()
+                    except (httpx.ConnectError, httpx.TimeoutException) as err:
+                        delay = None if _is_tls_error(err) else \
+                            ir.connection_retry_delay(url, type(err).__name__, idempotent, attempt)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                        continue
+                    delay = ir.status_retry_delay(url, response.status_code, response.headers.get('Retry-After'),
+                                                  idempotent, attempt)
+                    if delay is None:
+                        break
+                    await response.aclose()
+                    await asyncio.sleep(delay)
+                    attempt += 1
+            ir.record_response(endpoint, method, data, response.status_code, len(response.content), started,
+                               server_response)
+            if invalidate_prefix:
+                cache_invalidate(ir.session_key, invalidate_prefix)
+            if response.is_success:
+                if 'json' in response.headers.get('Content-Type', ''):
+                    return ir.decode_json(endpoint, response.content, cache_key)
+                return response
+            raise ir.status_error(response.status_code, response.text)
+        except ConnectorError:
+            raise
+        except httpx.ConnectTimeout:
+            raise ConnectorError(TRANSPORT_ERRORS["connect_timeout"])
+        except httpx.ReadTimeout:
+            raise ConnectorError(TRANSPORT_ERRORS["read_timeout"])
+        except httpx.ConnectError as err:
+            raise ConnectorError(TRANSPORT_ERRORS["ssl" if _is_tls_error(err) else "connection"])
+        except Exception as err:
+            raise ConnectorError(str(err))
+
+    async def _acquire_token(self):
+        if not self.ir.rate_limit:
+            return
+        bucket = get_token_bucket(self.ir.host, self.ir.rate_limit)
+        delay = bucket.try_acquire()
+        while delay:
+            self.ir.record_rate_limit_wait(delay)
+            await asyncio.sleep(delay)
+            delay = bucket.try_acquire()
+
+    async def query_all(self, endpoint, payload, query_params=None, start=0, batch_size=ARTIFACT_PAGE_SIZE):
+        """
+        Return every record of a query_paged endpoint. After the first page all remaining pages are
+        requested at once and reassembled in offset order.
+        """
+        payload = check_payload(payload)
+
+        async def fetch_page(offset):
+            page_payload = dict(payload, start=offset, length=batch_size)
+            return await self.make_rest_call(endpoint, 'POST', params=query_params, data=json_dumps(page_payload))
+
+        first = await fetch_page(start)
+        if not first or not first.get('data'):
+            return []
+        records = list(first['data'])
+        records_total = first.get('recordsTotal', start + len(records))
+        pages = await asyncio.gather(*[fetch_page(offset)
+                                       for offset in range(start + batch_size, records_total, batch_size)])
+        for page in pages:
+            records.extend((page or {}).get('data') or [])
+        return records
+
+    async def fetch_incident_section(self, incident_id, key, params):
+        endpoint = INCIDENT_SECTIONS[key]["endpoint"].format(incident_id)
+        method = INCIDENT_SECTIONS[key]["method"]
+        if key == "artifacts":
+            if not params.get("length"):
+                artifacts = await self.query_all(endpoint, {"filters": params.get("filters")},
+                                                 {"include_records_total": True}, start=params.get("start") or 0)
+                return {"recordsTotal": len(artifacts), "data": artifacts}
+            payload = check_payload({
+                "start": params.get("start", 0),
+                "length": params.get("length"),
+                "filters": params.get("filters", [])
+            })
+            return await self.make_rest_call(endpoint, method, data=json_dumps(payload))
+        query_params = {k: v for k, v in params.items() if k not in ("filters", "start", "length")}
+        return await self.make_rest_call(endpoint, method, params=query_params)
+
+
+def fetch_incident_sections(config, incident_ids, params, concurrency=SESSION_POOL_MAXSIZE):
+    """
+    Blocking wrapper that fetches every INCIDENT_SECTIONS entry of every incident on one event loop.
+    Returns {incident_id: {section: result or exception}}.
+    """
+    async def run():
+        async with IBMResilientAsync(config, concurrency=concurrency) as client:
+            tasks = [(incident_id, key, client.fetch_incident_section(incident_id, key, params))
+                     for incident_id in incident_ids for key in INCIDENT_SECTIONS]
+            results = await asyncio.gather(*[task for _, _, task in tasks], return_exceptions=True)
+        sections = {}
+        for (incident_id, key, _), result in zip(tasks, results):
+            sections.setdefault(incident_id, {})[key] = result
+        return sections
+
+    return asyncio.run(run())
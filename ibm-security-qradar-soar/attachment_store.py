@@ -0,0 +1,282 @@
+"""
+Copyright start
+MIT License
+Copyright (c) 2025 Fortinet Inc
+Copyright end
+"""
+
+import hashlib, json, os, shutil, threading, time
+from contextlib import contextmanager
+import requests
+from connectors.core.connector import get_logger, ConnectorError
+from . import metrics
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = get_logger('ibm-security-qradar-soar')
+
+DEFAULT_QUOTA = 1024 * 1024 * 1024  # Bytes of attachment contents kept before the least recently used are evicted
+PARTIAL_MAX_AGE = 24 * 3600  # Seconds an interrupted download is kept to be resumed
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+RESUME_RETRIES = 3  # Times a download dropped mid-body is resumed within one call
+
+# Striped locks so that two threads never download the same attachment into the same partial file; other
+# worker processes are kept out by an flock on partial/<key>.lock
+_key_locks = [threading.Lock() for _ in range(64)]
+_evict_lock = threading.Lock()
+
+# Blobs whose contents this process has checked against their digest
+_verified = set()
+
+
+class AttachmentStore(object):
+    """
+    Content-addressed store of attachment contents on local disk:
+
+        blobs/<sha256>       contents, shared by every attachment with identical bytes
+        index/<key>.json     digest and size of an attachment, keyed by its listing metadata
+        partial/<key>.part   interrupted download, resumed with an HTTP Range request
+        partial/<key>.lock   held while the attachment is looked up or downloaded
+
+    The modification time of a blob records when it was last used; evict() removes the least recently
+    used blobs once the store outgrows its quota. A blob is checked against its digest before it is
+    stored and the first time each process serves it.
+    """
+
+    def __init__(self, root, quota=DEFAULT_QUOTA):
+        self.root = root
+        self.quota = quota
+        for name in ('blobs', 'index', 'partial'):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    @staticmethod
+    def attachment_key(server_url, incident_id, attachment):
+        """
+        Identify one version of an attachment from the incident's attachment listing. An attachment that
+        was replaced has a different size, creation time or version and therefore a different key.
+        """
+        key = json.dumps([server_url, str(incident_id), attachment.get('id'), attachment.get('size'),
+                          attachment.get('created'), attachment.get('vers'), attachment.get('uuid')])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _path(self, kind, name):
+        return os.path.join(self.root, kind, name)
+
+    def lookup(self, key):
+        """
+        Return (blob path, size) of a stored attachment and mark it as used, or None if it is not stored.
+        """
+        index_path = self._path('index', key + '.json')
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with open(index_path) as f:
+                entry = json.load(f)
+            blob_path = self._path('blobs', entry['digest'])
+            if os.path.getsize(blob_path) != entry['size']:
+                raise ValueError('size mismatch')
+            if not _verify_blob(blob_path, entry['digest']):
+                logger.warning("Stored attachment {0} does not match its digest, downloading it again".format(key))
+                _remove(blob_path)
+                raise ValueError('digest mismatch')
+            os.utime(blob_path)
+        except (OSError, ValueError, KeyError):
+            # Evicted or damaged; the attachment is downloaded again
+            _remove(index_path)
+            return None
+        return blob_path, entry['size']
+
+    def fetch(self, ir, endpoint, key, expected_size=None, max_file_size=None):
+        """
+        Return (blob path, size, downloaded) for an attachment, downloading it only if it is not stored yet.
+        """
+        with _key_locks[int(key[:8], 16) % len(_key_locks)], _file_lock(self._path('partial', key + '.lock')):
+            found = self.lookup(key)
+            if found:
+                if ir.record_metrics:
+                    metrics.inc('attachment_store_hits_total')
+                return found + (False,)
+            if ir.record_metrics:
+                metrics.inc('attachment_store_misses_total')
+            blob_path, size = self._download(ir, endpoint, key, expected_size, max_file_size)
+            return blob_path, size, True
+
+    def _download(self, ir, endpoint, key, expected_size, max_file_size):
+        part_path = self._path('partial', key + '.part')
+        digest = hashlib.sha256()
+        size = 0
+        if os.path.exists(part_path):
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    size += len(chunk)
+            logger.info("Resuming download of {0} from byte {1}".format(endpoint, size))
+        attempt = 0
+        while True:
+            try:
+                response = ir.make_rest_call(endpoint, 'GET', stream=True,
+                                             headers={'Range': 'bytes={0}-'.format(size)} if size else None)
+            except ConnectorError as err:
+                if size and str(err).startswith('416'):
+                    # The partial file does not fit the attachment on the server; start over
+                    _remove(part_path)
+                    digest, size = hashlib.sha256(), 0
+                    continue
+                raise
+            try:
+                if size and response.status_code != 206:
+                    logger.debug("Range requests are not supported, downloading {0} from the start".format(endpoint))
+                    digest, size = hashlib.sha256(), 0
+                with open(part_path, 'ab' if size else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        size += len(chunk)
+                        if max_file_size and size > max_file_size:
+                            raise ConnectorError("Attachment exceeds the maximum size of {0} bytes".format(
+                                max_file_size))
+                        f.write(chunk)
+                        digest.update(chunk)
+                break
+            except requests.exceptions.RequestException as err:
+                if attempt >= RESUME_RETRIES:
+                    raise ConnectorError("Download of {0} was interrupted: {1}".format(endpoint, err))
+                attempt += 1
+                logger.warning("Download of {0} was interrupted after {1} bytes, resuming".format(endpoint, size))
+                if ir.record_metrics:
+                    metrics.inc('attachment_resumes_total')
+            except ConnectorError:
+                _remove(part_path)
+                raise
+            finally:
+                response.close()
+        if expected_size is not None and size != int(expected_size):
+            _remove(part_path)
+            raise ConnectorError("Downloaded {0} bytes but the attachment has {1} bytes".format(size, expected_size))
+        digest = digest.hexdigest()
+        if _file_digest(part_path) != digest:
+            # The partial file was changed behind this download; never store it
+            _remove(part_path)
+            raise ConnectorError("Download of {0} was corrupted, retry the action".format(endpoint))
+        blob_path = self._path('blobs', digest)
+        if os.path.exists(blob_path) and _verify_blob(blob_path, digest):
+            # The same contents are already stored for another attachment
+            _remove(part_path)
+            os.utime(blob_path)
+        else:
+            os.replace(part_path, blob_path)
+            _verified.add(blob_path)
+        index_path = self._path('index', key + '.json')
+        with open(index_path + '.tmp', 'w') as f:
+            json.dump({"digest": digest, "size": size}, f)
+        os.replace(index_path + '.tmp', index_path)
+        return blob_path, size
+
+    def evict(self):
+        """
+        Remove the least recently used blobs until the store fits in its quota, and partial downloads that
+        were abandoned for longer than PARTIAL_MAX_AGE. Returns the number of bytes freed.
+        """
+        freed = 0
+        with _evict_lock:
+            blobs = []
+            for entry in os.scandir(os.path.join(self.root, 'blobs')):
+                stat = entry.stat()
+                blobs.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in blobs)
+            for mtime, size, path in sorted(blobs):
+                if total <= self.quota:
+                    break
+                _remove(path)
+                _verified.discard(path)
+                total -= size
+                freed += size
+            expired = time.time() - PARTIAL_MAX_AGE
+            for entry in os.scandir(os.path.join(self.root, 'partial')):
+                stat = entry.stat()
+                if stat.st_mtime >= expired:
+                    continue
+                if entry.name.endswith('.lock'):
+                    _remove_lock(entry.path)
+                else:
+                    _remove(entry.path)
+                    freed += stat.st_size
+        if freed:
+            logger.info("Evicted {0} bytes from the attachment store".format(freed))
+        return freed
+
+    @staticmethod
+    def link_or_copy(source, destination):
+        """
+        Expose a stored blob under another name without copying it when the filesystem allows.
+        """
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _verify_blob(blob_path, digest):
+    """
+    Check a blob against its digest the first time this process uses it.
+    """
+    if blob_path in _verified:
+        return True
+    if _file_digest(blob_path) != digest:
+        return False
+    _verified.add(blob_path)
+    return True
+
+
+@contextmanager
+def _file_lock(path):
+    """
+    Hold an exclusive flock on path, shared with every process using the same store. Without fcntl only
+    the in-process locks apply.
+    """
+    if fcntl is None:
+        yield
+        return
+    while True:
+        f = open(path, 'a')
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            # evict() may have removed the file while this process waited for it
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        f.close()
+    try:
+        os.utime(path)
+        yield
+    finally:
+        f.close()
+
+
+def _remove_lock(path):
+    # Only remove a lock file that nobody holds; waiters notice the removal and open a new one
+    if fcntl is None:
+        return _remove(path)
+    try:
+        with open(path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            _remove(path)
+    except (BlockingIOError, FileNotFoundError):
+        pass
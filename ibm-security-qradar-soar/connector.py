@@ -5,7 +5,8 @@ Copyright (c) 2025 Fortinet Inc
 Copyright end
 """
 
-from .operations import operations, check_health
+import time
+from . import metrics
 from connectors.core.connector import Connector, get_logger, ConnectorError
 
 logger = get_logger('ibm-security-qradar-soar')
@@ -13,15 +14,28 @@ logger = get_logger('ibm-security-qradar-soar')
 
 class IBMResilient(Connector):
     def execute(self, config, operation, params, **kwargs):
+        # Checked per call: other actions in this process may run with a configuration that disables metrics
+        started = time.monotonic() if config.get('enable_metrics') else None
+        status = 'failure'
         try:
+            # Imported on first use so that loading the connector does not pay for requests and the handlers
+            from .operations import operations
             action = operations.get(operation)
             logger.info('Executing action {}'.format(action))
-            return action(config, params)
+            result = action(config, params)
+            status = 'success'
+            return result
         except Exception as err:
             logger.exception("An exception occurred [{}]".format(err))
             raise ConnectorError("An exception occurred [{}]".format(err))
+        finally:
+            if started is not None:
+                metrics.observe('operation_duration_seconds', time.monotonic() - started, operation=operation)
+                metrics.inc('operations_total', operation=operation, status=status)
 
     def check_health(self, config):
         logger.info('starting health check')
-        check_health(config)
+        from .operations import check_health
+        result = check_health(config)
         logger.info('completed health check no errors')
+        return result
@@ -0,0 +1,127 @@
+"""
+Copyright start
+MIT License
+Copyright (c) 2025 Fortinet Inc
+Copyright end
+"""
+
+import json, re, threading
+from connectors.core.connector import get_logger
+
+logger = get_logger('ibm-security-qradar-soar')
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRIC_PREFIX = 'ibm_soar_'
+
+ID_PATTERN = re.compile(r'/\d+')
+
+# Shared by every configuration in the process; callers only record when their configuration has
+# "Enable Metrics" set, since concurrent actions may run with different configurations
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+class Histogram(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+def endpoint_template(endpoint):
+    """
+    Collapse IDs so that "/incidents/123/tasks" and "/incidents/456/tasks" share one series.
+    """
+    return ID_PATTERN.sub('/{id}', endpoint)
+
+
+def observe(name, value, **labels):
+    key = (name, _label_key(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(value)
+
+
+def inc(name, value=1, **labels):
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def snapshot():
+    """
+    Return all recorded metrics as a JSON serializable dict.
+    """
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = [{"name": name, "labels": dict(labels), "count": h.count, "sum": h.sum,
+                       "buckets": dict(zip([str(b) for b in h.buckets], _cumulative(h.counts)))}
+                      for (name, labels), h in sorted(_histograms.items(), key=lambda item: item[0])]
+    return {"counters": counters, "histograms": histograms}
+
+
+def to_prometheus():
+    """
+    Render all recorded metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    with _lock:
+        for (name, labels), value in sorted(_counters.items()):
+            lines.append('{0}{1}{2} {3}'.format(METRIC_PREFIX, name, _labels(labels), value))
+        for (name, labels), h in sorted(_histograms.items(), key=lambda item: item[0]):
+            for bound, count in zip(h.buckets, _cumulative(h.counts)):
+                lines.append('{0}{1}_bucket{2} {3}'.format(METRIC_PREFIX, name, _labels(labels + (('le', bound),)),
+                                                           count))
+            lines.append('{0}{1}_bucket{2} {3}'.format(METRIC_PREFIX, name, _labels(labels + (('le', '+Inf'),)),
+                                                       h.count))
+            lines.append('{0}{1}_sum{2} {3}'.format(METRIC_PREFIX, name, _labels(labels), h.sum))
+            lines.append('{0}{1}_count{2} {3}'.format(METRIC_PREFIX, name, _labels(labels), h.count))
+    return '\n'.join(lines) + '\n'
+
+
+def log_metrics():
+    """
+    Write one structured (JSON) log line per recorded metric.
+    """
+    data = snapshot()
+    for metric in data["counters"] + data["histograms"]:
+        logger.info("metric {0}".format(json.dumps(metric, sort_keys=True)))
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _cumulative(counts):
+    total = 0
+    result = []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{0}="{1}"'.format(k, str(v).replace('"', '\\"')) for k, v in labels) + '}'
@@ -5,11 +5,301 @@ Copyright (c) 2025 Fortinet Inc
 Copyright end
 """
 
-import requests, json, os
+import requests, json, logging, os, re, copy, random, tempfile, threading, time
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from connectors.core.connector import get_logger, ConnectorError
+from . import metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = get_logger('ibm-security-qradar-soar')
 
+# Connection pool tuning for the shared sessions
+SESSION_POOL_CONNECTIONS = 10  # Number of per-host pools kept by a session
+SESSION_POOL_MAXSIZE = 20  # Maximum connections kept open per host
+SESSION_POOL_BLOCK = True  # Wait for a free connection instead of exceeding SESSION_POOL_MAXSIZE
+SESSION_IDLE_TIMEOUT = 300  # Seconds after which an unused session is closed
+
+MAX_WORKERS = 8  # Upper bound on concurrent requests issued by a single action
+DEFAULT_CONCURRENT_DOWNLOADS = 4
+DEFAULT_CONCURRENT_UPLOADS = 4
+UPLOAD_PROGRESS_INTERVAL = 5  # Seconds between progress log lines of an upload
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+ATTACHMENT_STORE_DIR = os.path.join(tempfile.gettempdir(), 'ibm-security-qradar-soar', 'attachments')
+
+ARTIFACT_PAGE_SIZE = 1000
+
+TYPE_CACHE_TTL = 3600  # Seconds the org's incident field definitions are reused before being re-read
+
+# Bulk update and close
+BULK_FETCH_BATCH_SIZE = 100  # Incidents whose current state is read per query_paged request
+BULK_CONCURRENCY = 8
+CONFLICT_RETRIES = 3
+
+CLOSE_RESOLUTION_REQUIRED = 'Resolution and resolution summary of the incident should be updated before closing ' \
+                            'an incident.'
+
+# Incremental sync checkpoints
+CHECKPOINT_DIR = os.path.join(tempfile.gettempdir(), 'ibm-security-qradar-soar')
+DEFAULT_CLOCK_SKEW = 60  # Seconds the sync window is re-opened to absorb server clock skew
+
+# Adaptive page sizing for query_paged pagination
+MIN_PAGE_SIZE = 100
+PAGE_LATENCY_LOW = 1.0  # Seconds; faster pages grow the page size back toward the requested length
+PAGE_LATENCY_HIGH = 5.0  # Seconds; slower pages halve the page size
+
+LOG_PREVIEW_BYTES = 2048  # Longest request/response body excerpt written to debug logs
+
+# Retries of transient failures; 429 is retried for every method since the server did not process the request
+MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.5  # Seconds; doubled on every attempt
+RETRY_MAX_DELAY = 30
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+# Optional client-side rate limit per SOAR host, enabled per configuration by "Rate Limit" and shared by all
+# actions in this process that use the same host and limit
+RATE_LIMIT_BURST_SECONDS = 2  # Requests that may be sent at once, in seconds' worth of the rate limit
+
+# In-process cache of GET responses, enabled per configuration by "Response Cache TTL"
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+INCIDENT_ENDPOINT_PATTERN = re.compile(r'^/incidents/(\d+)')
+
+# Errors reported for requests that got no response, whichever client sent them
+TRANSPORT_ERRORS = {
+    "ssl": 'SSL certificate validation failed',
+    "connect_timeout": 'The request timed out while trying to connect to the server',
+    "read_timeout": 'The server did not send any data in the allotted amount of time',
+    "connection": 'Invalid Credentials'
+}
+
+# Health check probes: "Organization" reads the org record, whose cost does not grow with its data
+HEALTH_CHECK_PROBES = {
+    "Organization": ("", None),
+    "Simulations": ("/incidents/simulations", {"want_closed": True})
+}
+HEALTH_CHECK_TTL = 30  # Seconds a successful health check is reused for the same configuration
+HEALTH_CHECK_SLOW = 5  # Seconds above which a health check is logged as a warning
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_log_redactor = None
+
+_token_buckets = {}
+_token_buckets_lock = threading.Lock()
+
+_type_cache = {}
+_type_cache_lock = threading.Lock()
+
+_response_cache = OrderedDict()
+_response_cache_bytes = 0
+_response_cache_lock = threading.Lock()
+
+_health_cache = {}
+_health_cache_lock = threading.Lock()
+
+
+def json_dumps(obj):
+    """
+    Serialize a request body to UTF-8 JSON bytes, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
+
+def json_loads(data):
+    """
+    Parse a JSON response body directly from its bytes, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def set_log_redactor(redactor):
+    """
+    Register a callable that takes the text of a body excerpt and returns it with sensitive values masked,
+    before it is written to the debug log. Pass None to remove it.
+    """
+    global _log_redactor
+    _log_redactor = redactor
+
+
+class LogPreview(object):
+    """
+    Deferred, size-capped rendering of a request or response body for debug logging. Nothing is decoded
+    or copied unless the log record is actually emitted.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        value = self.value
+        if value is None:
+            return ''
+        if isinstance(value, bytes):
+            size = len(value)
+            preview = value[:LOG_PREVIEW_BYTES].decode('utf-8', errors='replace')
+        else:
+            preview = value if isinstance(value, str) else str(value)
+            size = len(preview)
+            preview = preview[:LOG_PREVIEW_BYTES]
+        if _log_redactor is not None:
+            preview = _log_redactor(preview)
+        if size > LOG_PREVIEW_BYTES:
+            preview = '{0}... [truncated, {1} bytes]'.format(preview, size)
+        return preview
+
+
+def _create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=SESSION_POOL_CONNECTIONS, pool_maxsize=SESSION_POOL_MAXSIZE,
+                          pool_block=SESSION_POOL_BLOCK)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(session_key):
+    """
+    Return the keep-alive session shared by all configurations with the same
+    (server_url, org_id, api_key, verify_ssl), evicting sessions left idle for too long.
+    """
+    now = time.monotonic()
+    with _sessions_lock:
+        for key, (session, last_used) in list(_sessions.items()):
+            if now - last_used > SESSION_IDLE_TIMEOUT:
+                logger.debug("Closing idle session for {0}".format(key[0]))
+                session.close()
+                del _sessions[key]
+        entry = _sessions.get(session_key)
+        session = entry[0] if entry else _create_session()
+        _sessions[session_key] = (session, now)
+        return session
+
+
+class TokenBucket(object):
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """
+        Take one token if available. Returns 0 on success, otherwise the seconds until one is available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available. Returns the number of seconds waited.
+        """
+        waited = 0.0
+        delay = self.try_acquire()
+        while delay:
+            time.sleep(delay)
+            waited += delay
+            delay = self.try_acquire()
+        return waited
+
+
+def get_token_bucket(host, rate):
+    with _token_buckets_lock:
+        bucket = _token_buckets.get((host, rate))
+        if bucket is None:
+            bucket = _token_buckets[(host, rate)] = TokenBucket(rate, max(1, rate * RATE_LIMIT_BURST_SECONDS))
+        return bucket
+
+
+def _retry_delay(attempt, retry_after=None):
+    """
+    Seconds to wait before the next attempt: the server's Retry-After when given, otherwise
+    exponential backoff with jitter.
+    """
+    if retry_after:
+        try:
+            return min(RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            from email.utils import parsedate_to_datetime
+            try:
+                return min(RETRY_MAX_DELAY, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+            except (TypeError, ValueError):
+                pass
+    backoff = min(RETRY_MAX_DELAY, RETRY_BACKOFF_FACTOR * (2 ** attempt))
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+def _cache_key(session_key, endpoint, params):
+    normalized = tuple(sorted((str(k), json.dumps(v, sort_keys=True)) for k, v in (params or {}).items()
+                              if v is not None and v != ''))
+    return session_key, endpoint, normalized
+
+
+def cache_get(key):
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        expires, size, value = entry
+        if expires < time.monotonic():
+            _cache_remove(key)
+            return None
+        _response_cache.move_to_end(key)
+    # Callers are free to modify what they get back
+    return copy.deepcopy(value)
+
+
+def cache_put(key, value, size, ttl):
+    global _response_cache_bytes
+    if size > CACHE_MAX_BYTES:
+        return
+    with _response_cache_lock:
+        _cache_remove(key)
+        _response_cache[key] = (time.monotonic() + ttl, size, copy.deepcopy(value))
+        _response_cache_bytes += size
+        while len(_response_cache) > CACHE_MAX_ENTRIES or _response_cache_bytes > CACHE_MAX_BYTES:
+            _cache_remove(next(iter(_response_cache)))
+
+
+def cache_invalidate(session_key, endpoint_prefix):
+    """
+    Drop the cached responses of endpoint_prefix and everything below it, e.g. "/incidents/123"
+    also drops "/incidents/123/tasks".
+    """
+    with _response_cache_lock:
+        for key in list(_response_cache):
+            if key[0] == session_key and (key[1] == endpoint_prefix or key[1].startswith(endpoint_prefix + '/')):
+                _cache_remove(key)
+
+
+def _cache_remove(key):
+    # Callers hold _response_cache_lock
+    global _response_cache_bytes
+    entry = _response_cache.pop(key, None)
+    if entry:
+        _response_cache_bytes -= entry[1]
+
 
 class IBMResilient(object):
     def __init__(self, config, *args, **kwargs):
@@ -21,51 +311,310 @@ class IBMResilient(object):
         else:
             self.url = url + '/rest/orgs/{0}'.format(config.get('org_id'))
         self.verify_ssl = config.get('verify_ssl')
+        self.session_key = (self.url, config.get('org_id'), self.api_key, self.verify_ssl)
+        self.cache_ttl = config.get('cache_ttl') or 0
+        self.host = urlparse(self.url).netloc
+        self.rate_limit = float(config.get('rate_limit') or 0)
+        self.record_metrics = bool(config.get('enable_metrics'))
+        self.session = None  # Overrides the shared pooled session, e.g. to time opening a new connection
+
+    # The request policy below is shared with IBMResilientAsync in async_client.py, so that both clients
+    # cache, retry, record metrics and report errors the same way
+
+    def check_cache(self, endpoint, method, params=None, stream=False):
+        """
+        Apply the response cache before a request. Returns (cached, cache_key, invalidate_prefix): a cached
+        result to return instead of sending the GET, the key to cache a fresh result under, and for a change
+        to an incident, the endpoint whose cached reads it makes stale. Those are dropped now and must be
+        dropped again with cache_invalidate once the change completes.
+        """
+        if method == 'GET' and self.cache_ttl and not stream:
+            cache_key = _cache_key(self.session_key, endpoint, params)
+            cached = cache_get(cache_key)
+            if cached is not None:
+                logger.debug("Cache hit for {0}".format(self.url + endpoint))
+                if self.record_metrics:
+                    metrics.inc('cache_hits_total', endpoint=metrics.endpoint_template(endpoint))
+            return cached, cache_key, None
+        if method != 'GET' and not endpoint.endswith('/query_paged'):
+            # Any change to an incident or its children makes its cached reads stale
+            match = INCIDENT_ENDPOINT_PATTERN.match(endpoint)
+            if match:
+                cache_invalidate(self.session_key, match.group(0))
+                return None, None, match.group(0)
+        return None, None, None
+
+    @staticmethod
+    def is_idempotent(endpoint, method):
+        # query_paged POSTs only read data and are as safe to repeat as a GET
+        return method in IDEMPOTENT_METHODS or endpoint.endswith('/query_paged')
+
+    def connection_retry_delay(self, url, error_name, idempotent, attempt):
+        """
+        Seconds to wait before retrying a request that could not connect or timed out, or None if it must
+        not be retried. Certificate validation failures are final and are not passed here.
+        """
+        if not idempotent or attempt >= MAX_RETRIES:
+            return None
+        delay = _retry_delay(attempt)
+        logger.warning("{0} failed with {1}, retrying in {2:.2f}s".format(url, error_name, delay))
+        self._record_retry(error_name, delay)
+        return delay
+
+    def status_retry_delay(self, url, status_code, retry_after, idempotent, attempt):
+        """
+        Seconds to wait before retrying a request answered with status_code, or None if the response stands.
+        """
+        if status_code not in RETRY_STATUS_CODES or attempt >= MAX_RETRIES or \
+                not (idempotent or status_code == 429):
+            return None
+        delay = _retry_delay(attempt, retry_after)
+        logger.warning("{0} returned {1}, retrying in {2:.2f}s".format(url, status_code, delay))
+        self._record_retry(status_code, delay)
+        return delay
 
-    def make_rest_call(self, endpoint, method, data=None, params=None):
+    def _record_retry(self, status, delay):
+        if self.record_metrics:
+            metrics.inc('http_retries_total', status=status)
+            metrics.inc('http_retry_delay_seconds_total', delay)
+
+    def record_rate_limit_wait(self, waited):
+        if waited and self.record_metrics:
+            metrics.inc('rate_limit_wait_seconds_total', waited)
+
+    def record_response(self, endpoint, method, data, status_code, response_bytes, started, server_response=None):
+        """
+        Record the metrics of a completed request that started at time.monotonic() `started`, retries
+        included. server_response is the number of seconds until the response headers of the last attempt
+        arrived, i.e. excluding the body transfer.
+        """
+        if not self.record_metrics:
+            return
+        labels = {"endpoint": metrics.endpoint_template(endpoint), "method": method}
+        metrics.observe('request_duration_seconds', time.monotonic() - started, **labels)
+        if server_response is not None:
+            metrics.observe('server_response_seconds', server_response, **labels)
+        metrics.inc('requests_total', status=status_code, **labels)
+        metrics.inc('request_bytes_total', len(data) if data else 0, **labels)
+        metrics.inc('response_bytes_total', response_bytes, **labels)
+
+    def decode_json(self, endpoint, content, cache_key=None):
+        """
+        Parse a JSON response body and cache the result under cache_key, if given.
+        """
+        if self.record_metrics:
+            decode_started = time.monotonic()
+            result = json_loads(content)
+            metrics.observe('json_decode_seconds', time.monotonic() - decode_started,
+                            endpoint=metrics.endpoint_template(endpoint))
+        else:
+            result = json_loads(content)
+        if cache_key and isinstance(result, (dict, list)):
+            cache_put(cache_key, result, len(content), self.cache_ttl)
+        return result
+
+    @staticmethod
+    def status_error(status_code, text):
+        logger.error("{0}".format(status_code))
+        return ConnectorError("{0}:{1}".format(status_code, text))
+
+    def make_rest_call(self, endpoint, method, data=None, params=None, stream=False, headers=None):
         try:
             url = self.url + endpoint
-            headers = {
+            started = time.monotonic()
+            cached, cache_key, invalidate_prefix = self.check_cache(endpoint, method, params, stream)
+            if cached is not None:
+                return cached
+            headers = dict({
                 'Content-Type': 'application/json'
-            }
+            }, **(headers or {}))
             logger.debug("Endpoint {0}".format(url))
-            response = requests.request(method, url, auth=(self.api_key, self.api_secret), data=data, params=params,
-                                        headers=headers, verify=self.verify_ssl)
-            logger.debug("response_content {0}:{1}".format(response.status_code, response.content))
+            session = self.session or get_session(self.session_key)
+            idempotent = self.is_idempotent(endpoint, method)
+            attempt = 0
+            while True:
+                if attempt and hasattr(data, 'seek'):
+                    # The failed attempt consumed the streamed body
+                    data.seek(0)
+                if self.rate_limit:
+                    self.record_rate_limit_wait(get_token_bucket(self.host, self.rate_limit).acquire())
+                try:
+                    response = session.request(method, url, auth=(self.api_key, self.api_secret), data=data,
+                                               params=params, headers=headers, verify=self.verify_ssl, stream=stream)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                    delay = None if isinstance(err, requests.exceptions.SSLError) else \
+                        self.connection_retry_delay(url, type(err).__name__, idempotent, attempt)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                delay = self.status_retry_delay(url, response.status_code, response.headers.get('Retry-After'),
+                                                idempotent, attempt)
+                if delay is None:
+                    break
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+            if self.record_metrics:
+                # A streamed body has not been read yet; its size is the one announced
+                response_bytes = int(response.headers.get('Content-Length') or 0) if stream else \
+                    len(response.content or b'')
+                self.record_response(endpoint, method, data, response.status_code, response_bytes, started,
+                                     response.elapsed.total_seconds())
+            if invalidate_prefix:
+                # Reads that completed while the change was in flight may have cached the old state
+                cache_invalidate(self.session_key, invalidate_prefix)
+            if not stream:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("response_content %s:%s", response.status_code, LogPreview(response.content))
             if response.ok or response.status_code == 204:
                 logger.info('Successfully got response for url {0}'.format(url))
+                if stream:
+                    # The caller consumes and closes the streamed body
+                    return response
                 if 'json' in str(response.headers):
-                    return response.json()
+                    return self.decode_json(endpoint, response.content, cache_key)
                 else:
                     return response
             else:
-                logger.error("{0}".format(response.status_code))
-                raise ConnectorError("{0}:{1}".format(response.status_code, response.text))
+                raise self.status_error(response.status_code, response.text)
         except requests.exceptions.SSLError:
-            raise ConnectorError('SSL certificate validation failed')
+            raise ConnectorError(TRANSPORT_ERRORS["ssl"])
         except requests.exceptions.ConnectTimeout:
-            raise ConnectorError('The request timed out while trying to connect to the server')
+            raise ConnectorError(TRANSPORT_ERRORS["connect_timeout"])
         except requests.exceptions.ReadTimeout:
-            raise ConnectorError(
-                'The server did not send any data in the allotted amount of time')
+            raise ConnectorError(TRANSPORT_ERRORS["read_timeout"])
         except requests.exceptions.ConnectionError:
-            raise ConnectorError('Invalid Credentials')
+            raise ConnectorError(TRANSPORT_ERRORS["connection"])
         except Exception as err:
             raise ConnectorError(str(err))
 
 
 def check_payload(payload):
+    """
+    Drop empty ('' or None) values and empty objects from a request payload, including objects nested in lists.
+    """
+    if isinstance(payload, list):
+        values = [check_payload(value) if isinstance(value, (dict, list)) else value for value in payload]
+        return [value for value in values if value != {}]
     updated_payload = {}
     for key, value in payload.items():
-        if isinstance(value, dict):
-            nested = check_payload(value)
-            if len(nested.keys()) > 0:
-                updated_payload[key] = nested
-        elif value != '' and value is not None:
-            updated_payload[key] = value
+        if isinstance(value, (dict, list)):
+            value = check_payload(value)
+            if value == {}:
+                continue
+        elif value == '' or value is None:
+            continue
+        updated_payload[key] = value
     return updated_payload
 
 
+def get_field_definitions(ir, type_name='incident'):
+    """
+    Return the field definitions of an object type, keyed by (prefix, name) where prefix is "properties"
+    for custom fields and None otherwise. Definitions are cached per server for TYPE_CACHE_TTL seconds.
+    """
+    key = (ir.session_key, type_name)
+    now = time.monotonic()
+    with _type_cache_lock:
+        entry = _type_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+    fields = ir.make_rest_call('/types/{0}/fields'.format(type_name), 'GET')
+    definitions = {(field.get('prefix'), field.get('name')): field for field in fields or []}
+    with _type_cache_lock:
+        _type_cache[key] = (now + TYPE_CACHE_TTL, definitions)
+    return definitions
+
+
+def _normalize_select(definition, value, errors):
+    """
+    Resolve select/multiselect labels to their value IDs. Other input types are returned unchanged.
+    """
+    input_type = definition.get('input_type')
+    if input_type not in ('select', 'multiselect') or value is None:
+        return value
+    choices = definition.get('values') or []
+    ids = {choice.get('value') for choice in choices}
+    labels = {str(choice.get('label')).lower(): choice.get('value') for choice in choices}
+
+    def resolve(item):
+        if item in ids:
+            return item
+        if str(item).lower() in labels:
+            return labels[str(item).lower()]
+        errors.append("'{0}' is not a valid value for field '{1}'".format(item, definition.get('name')))
+        return item
+
+    if input_type == 'multiselect' and isinstance(value, list):
+        return [resolve(item) for item in value]
+    return resolve(value)
+
+
+def validate_incident_payload(ir, payload):
+    """
+    Check the field names of an incident payload, including its custom "properties", against the org's
+    incident field definitions and resolve select labels to IDs. Raises ConnectorError listing every problem.
+    """
+    definitions = get_field_definitions(ir)
+    errors = []
+    normalized = {}
+    for name, value in payload.items():
+        if name == 'properties' and isinstance(value, dict):
+            properties = {}
+            for prop_name, prop_value in value.items():
+                definition = definitions.get(('properties', prop_name))
+                if definition is None:
+                    errors.append("Unknown custom field '{0}'".format(prop_name))
+                    properties[prop_name] = prop_value
+                else:
+                    properties[prop_name] = _normalize_select(definition, prop_value, errors)
+            normalized[name] = properties
+            continue
+        definition = definitions.get((None, name))
+        if definition is None:
+            errors.append("Unknown field '{0}'".format(name))
+            normalized[name] = value
+        else:
+            normalized[name] = _normalize_select(definition, value, errors)
+    if errors:
+        raise ConnectorError("Invalid incident fields: {0}".format('; '.join(errors)))
+    return normalized
+
+
+def validate_incident_changes(ir, changes):
+    """
+    Check the fields of PATCH changes and convert select labels given as {"text": ...} to {"id": ...}
+    and multiselect labels given as {"texts": [...]} or {"ids": [...]} to {"ids": [...]}.
+    """
+    definitions = get_field_definitions(ir)
+    errors = []
+    normalized = []
+    for change in changes or []:
+        field = change.get('field')
+        name = field.get('name') if isinstance(field, dict) else field
+        definition = definitions.get((None, name)) or definitions.get(('properties', name))
+        if definition is None:
+            errors.append("Unknown field '{0}'".format(name))
+            normalized.append(change)
+            continue
+        change = dict(change)
+        for key in ('old_value', 'new_value'):
+            value = change.get(key)
+            if not isinstance(value, dict):
+                continue
+            if definition.get('input_type') == 'select' and 'text' in value:
+                change[key] = {"id": _normalize_select(definition, value['text'], errors)}
+            elif definition.get('input_type') == 'multiselect' and ('texts' in value or 'ids' in value):
+                labels = value.get('texts', value.get('ids')) or []
+                change[key] = {"ids": _normalize_select(definition, labels, errors)}
+        normalized.append(change)
+    if errors:
+        raise ConnectorError("Invalid incident changes: {0}".format('; '.join(errors)))
+    return normalized
+
+
 def create_incident(config, params):
     try:
         ir = IBMResilient(config)
@@ -89,63 +638,301 @@ def create_incident(config, params):
         }
         additional_fields = params.pop('additional_fields')
         if additional_fields:
+            if params.get('validate_fields'):
+                additional_fields = validate_incident_payload(ir, additional_fields)
             payload.update(additional_fields)
         payload = check_payload(payload)
-        logger.debug("Payload {0}".format(payload))
-        response = ir.make_rest_call(endpoint, 'POST', params=query_params, data=json.dumps(payload))
+        logger.debug("Payload %s", LogPreview(payload))
+        response = ir.make_rest_call(endpoint, 'POST', params=query_params, data=json_dumps(payload))
         return response
     except Exception as err:
         raise ConnectorError(str(err))
 
 
+def parse_fields(fields):
+    """
+    Accept a list of field names or a comma separated string of them. Dotted names such as
+    "properties.custom_field" select nested values.
+    """
+    if not fields:
+        return []
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    return [field.strip() for field in fields if field and field.strip()]
+
+
+def apply_field_projection(query_params, fields):
+    """
+    Let the server do as much of the projection as it can: custom fields requested as "properties.<name>"
+    are passed as field_handle so that only those custom fields are returned.
+    """
+    custom_fields = [field.split('.', 1)[1] for field in fields if field.startswith('properties.')]
+    if custom_fields and not query_params.get('field_handle'):
+        query_params['field_handle'] = custom_fields
+    return query_params
+
+
+def project_records(records, fields):
+    """
+    Trim each record down to the requested (possibly dotted) fields.
+    """
+    if not fields:
+        return records
+    paths = [field.split('.') for field in fields]
+    projected = []
+    for record in records:
+        trimmed = {}
+        for path in paths:
+            value = record
+            for part in path:
+                if not isinstance(value, dict) or part not in value:
+                    break
+                value = value[part]
+            else:
+                target = trimmed
+                for part in path[:-1]:
+                    target = target.setdefault(part, {})
+                target[path[-1]] = value
+        projected.append(trimmed)
+    return projected
+
+
+def iter_query_paged(ir, endpoint, payload, query_params, start=0, batch_size=1000, max_records=None,
+                     concurrency=1, fields=None):
+    """
+    Yield the "data" pages of a query_paged endpoint in order. Once the first response reports
+    recordsTotal, up to `concurrency` of the remaining pages are fetched in parallel. The page size
+    shrinks while the server is slow to respond and grows back toward batch_size once it recovers.
+    A server that returns fewer records than asked for caps the page size: reading resumes after the last
+    record it returned, with pages no larger than that. When fields are given each page is trimmed to
+    them as it arrives.
+    """
+    payload = check_payload(payload)
+    logger.debug("Query Parameters %s", LogPreview(query_params))
+    logger.debug("Payload %s", LogPreview(payload))
+
+    def fetch_page(offset, length):
+        page_payload = dict(payload, start=offset, length=length)
+        started = time.monotonic()
+        response = ir.make_rest_call(endpoint, 'POST', params=query_params, data=json_dumps(page_payload))
+        if ir.record_metrics:
+            metrics.inc('query_paged_pages_total', endpoint=metrics.endpoint_template(endpoint))
+        return response, time.monotonic() - started
+
+    # Never ask for more records than are still wanted
+    first_length = min(batch_size, max_records) if max_records else batch_size
+    response, elapsed = fetch_page(start, first_length)
+    # Check if response contains data
+    if not response or "data" not in response or not response["data"]:
+        return
+    page = response["data"]
+    if max_records and len(page) >= max_records:
+        yield project_records(page[:max_records], fields)
+        return
+    retrieved = len(page)
+    yield project_records(page, fields)
+
+    # Stop if all records have been retrieved
+    records_total = response.get("recordsTotal", start + len(page))
+    end = min(records_total, start + max_records) if max_records else records_total
+    offset = start + len(page)
+    page_size = max_page_size = batch_size if len(page) >= first_length else len(page)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        try:
+            while offset < end or pending:
+                # Keep up to `concurrency` pages in flight; they are yielded in offset order
+                while offset < end and len(pending) < max(1, concurrency):
+                    length = min(page_size, end - offset)
+                    pending.append((offset, length, executor.submit(fetch_page, offset, length)))
+                    offset += length
+                page_offset, length, future = pending.popleft()
+                response, elapsed = future.result()
+                if not response or "data" not in response or not response["data"]:
+                    return
+                page = response["data"]
+                if max_records and retrieved + len(page) >= max_records:
+                    yield project_records(page[:max_records - retrieved], fields)
+                    return
+                retrieved += len(page)
+                yield project_records(page, fields)
+
+                if len(page) < length:
+                    # The pages in flight start past the records this one left out; ask again from there
+                    max_page_size = page_size = len(page)
+                    offset = page_offset + len(page)
+                    logger.debug("Server returned {0} of {1} records, reducing page size to {0}".format(
+                        len(page), length))
+                    for _, _, future in pending:
+                        future.cancel()
+                    pending.clear()
+                elif elapsed > PAGE_LATENCY_HIGH and page_size > MIN_PAGE_SIZE:
+                    page_size = max(MIN_PAGE_SIZE, page_size // 2)
+                    logger.debug("Page took {0:.2f}s, reducing page size to {1}".format(elapsed, page_size))
+                elif elapsed < PAGE_LATENCY_LOW and page_size < max_page_size:
+                    page_size = min(max_page_size, page_size * 2)
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+
+def iter_incident_pages(config, params):
+    """
+    Yield pages of incidents from /incidents/query_paged as they arrive, stopping early
+    once max_records incidents have been yielded.
+    """
+    ir = IBMResilient(config)
+    query_params = {
+        "include_records_total": params.get('include_records_total', True),
+        "return_level": params.get('return_level').lower() if params.get('return_level') else '',
+        "field_handle": params.get('field_handle'),
+    }
+    query_params = {k: v for k, v in query_params.items() if v is not None and v != ''}
+    fields = parse_fields(params.get('fields'))
+    apply_field_projection(query_params, fields)
+    payload = {
+        "sorts": params.get("sorts"),
+        "filters": params.get("filters"),
+        "logic_type": params.get("logic_type").lower() if params.get("logic_type") else '',
+    }
+    return iter_query_paged(ir, '/incidents/query_paged', payload, query_params,
+                            start=params.get("start") or 0,
+                            batch_size=params.get("length") or 1000,  # Default to 1000 records per batch
+                            max_records=params.get("max_records"),
+                            concurrency=params.get("concurrent_pages") or 1,
+                            fields=fields)
+
+
 def search_incidents(config, params):
     try:
-        ir = IBMResilient(config)
-        endpoint = '/incidents/query_paged'
+        if params.get('output_to_file'):
+            # Spill the records to an NDJSON file page by page instead of holding them in memory
+            fd, file_path = tempfile.mkstemp(prefix='ibm-soar-incidents-', suffix='.ndjson')
+            records_count = 0
+            with os.fdopen(fd, 'wb') as f:
+                for page in iter_incident_pages(config, params):
+                    for record in page:
+                        f.write(json_dumps(record))
+                        f.write(b'\n')
+                    records_count += len(page)
+            logger.info(f"Total incidents written to {file_path}: {records_count}")
+            return {"file_path": file_path, "records_count": records_count}
+
         all_records = []
-        start = 0
-        batch_size = params.get("length", 1000)  # Default to 1000 records per batch
+        for page in iter_incident_pages(config, params):
+            all_records.extend(page)
+        logger.info(f"Total incidents retrieved: {len(all_records)}")
+        return all_records
+    except Exception as err:
+        raise ConnectorError(str(err))
 
-        while True:
-            # Update the pagination parameters for each request
-            payload = {
-                "start": start,
-                "length": batch_size,
-                "sorts": params.get("sorts"),
-                "filters": params.get("filters"),
-                "logic_type": params.get("logic_type").lower() if params.get("logic_type") else '',
-            }
-            payload = check_payload(payload)
 
-            query_params = {
-                "include_records_total": params.get('include_records_total', True),
-                "return_level": params.get('return_level').lower() if params.get('return_level') else '',
-                "field_handle": params.get('field_handle'),
-            }
-            query_params = {k: v for k, v in query_params.items() if v is not None and v != ''}
+def _checkpoint_path(config, filters):
+    import hashlib
+    key = json.dumps([config.get('server_url'), config.get('org_id'), config.get('api_key'), filters],
+                     sort_keys=True)
+    return os.path.join(CHECKPOINT_DIR, 'sync_{0}.json'.format(hashlib.sha256(key.encode()).hexdigest()))
 
-            logger.debug("Query Parameters {0}".format(query_params))
-            logger.debug("Payload {0}".format(payload))
 
-            # Fetch the current batch of incidents
-            response = ir.make_rest_call(endpoint, 'POST', params=query_params, data=json.dumps(payload))
+def _load_checkpoint(file_path):
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path) as f:
+        return json.load(f)
 
-            # Check if response contains data
-            if not response or "data" not in response or not response["data"]:
-                break
 
-            # Append the retrieved records to all_records
-            all_records.extend(response["data"])
+def _save_checkpoint(file_path, checkpoint):
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, file_path)
 
-            # Stop if all records have been retrieved
-            if start + batch_size >= response.get("recordsTotal", len(all_records)):
-                break
 
-            # Increment the start for the next batch
-            start += batch_size
+def sync_incidents(config, params):
+    """
+    Return the incidents created or modified since the previous sync of the same configuration and filters.
+    The query is re-opened by clock_skew seconds before the stored high-water mark; incidents already
+    returned at the same inc_last_modified_date are remembered so that ties are not returned twice.
+    Pages are read by keyset on (inc_last_modified_date, id) rather than by offset, so incidents modified
+    while the sync runs move behind the cursor instead of shifting unread incidents past it.
+    """
+    try:
+        filters = params.get('filters') or []
+        file_path = _checkpoint_path(config, filters)
+        checkpoint = params.get('checkpoint')
+        if not checkpoint and not params.get('reset_checkpoint'):
+            checkpoint = _load_checkpoint(file_path)
+        skew = params.get('clock_skew')
+        skew = (DEFAULT_CLOCK_SKEW if skew is None or skew == '' else int(skew)) * 1000
 
-        logger.info(f"Total incidents retrieved: {len(all_records)}")
-        return all_records
+        if checkpoint:
+            last_modified = checkpoint.get('last_modified', 0)
+            seen = checkpoint.get('seen', {})
+            since = max(0, last_modified - skew)
+        else:
+            last_modified = 0
+            seen = {}
+            since = params.get('start_time') or 0
+
+        fields = parse_fields(params.get('fields'))
+        if fields:
+            # The sync bookkeeping needs these whatever the caller asked for
+            fields = fields + [f for f in ('id', 'inc_last_modified_date') if f not in fields]
+        page_size = params.get('length') or 1000
+
+        def keyset_filters(cursor):
+            # Incidents after the cursor: modified later, or modified at the same time with a higher id
+            if cursor is None:
+                groups = [[{"field_name": "inc_last_modified_date", "method": "gte", "value": since}]]
+            else:
+                modified, incident_id = cursor
+                groups = [[{"field_name": "inc_last_modified_date", "method": "gt", "value": modified}],
+                          [{"field_name": "inc_last_modified_date", "method": "equals", "value": modified},
+                           {"field_name": "id", "method": "gt", "value": incident_id}]]
+            # Every group must be a conjunction so that the cursor conditions narrow it instead of being ORed
+            return [dict(f, conditions=selection + conditions, logic_type='all')
+                    for f, selection in selection_groups for conditions in groups]
+
+        selection_groups = []
+        for f in filters or [{}]:
+            conditions = f.get('conditions') or []
+            if (f.get('logic_type') or params.get('logic_type') or '').lower() == 'any' and conditions:
+                # Matching any condition of the group is matching one of the groups with a single condition
+                selection_groups.extend((f, [condition]) for condition in conditions)
+            else:
+                selection_groups.append((f, conditions))
+
+        incidents = []
+        cursor = None
+        while True:
+            search_params = dict(params, filters=keyset_filters(cursor), logic_type='all', fields=fields, start=0,
+                                 length=page_size, max_records=page_size, include_records_total=False,
+                                 sorts=[{"field_name": "inc_last_modified_date", "type": "asc"},
+                                        {"field_name": "id", "type": "asc"}])
+            page = [incident for records in iter_incident_pages(config, search_params) for incident in records]
+            for incident in page:
+                incident_id = str(incident.get('id'))
+                modified = incident.get('inc_last_modified_date')
+                if modified is not None and seen.get(incident_id) == modified:
+                    continue
+                incidents.append(incident)
+                if modified is not None:
+                    seen[incident_id] = modified
+                    last_modified = max(last_modified, modified)
+            if len(page) < page_size:
+                break
+            cursor = (page[-1].get('inc_last_modified_date'), page[-1].get('id'))
+
+        # Only incidents inside the skew window can be returned again by the next query
+        checkpoint = {
+            "last_modified": last_modified,
+            "seen": {k: v for k, v in seen.items() if v >= last_modified - skew}
+        }
+        _save_checkpoint(file_path, checkpoint)
+        logger.info("Incremental sync returned {0} incidents".format(len(incidents)))
+        return {"incidents": incidents, "count": len(incidents), "checkpoint": checkpoint}
     except Exception as err:
         raise ConnectorError(str(err))
 
@@ -181,32 +968,126 @@ def get_incident_details(config, params):
         raise ConnectorError(str(err))
 
 
+def cached_incident(ir, incident_id):
+    """
+    Return the incident as last read through the response cache, or None if it is not cached.
+    """
+    return cache_get(_cache_key(ir.session_key, '/incidents/{0}'.format(incident_id), {}))
+
+
 def update_incident(config, params):
     try:
         ir = IBMResilient(config)
-        endpoint = '/incidents/{0}'.format(params.pop('incident_id'))
+        incident_id = params.pop('incident_id')
+        endpoint = '/incidents/{0}'.format(incident_id)
         query_parameter = {
             "return_dto": True
         }
+        changes = params.get('changes')
+        if params.get('validate_fields'):
+            changes = validate_incident_changes(ir, changes)
+        if params.get('optimistic_update'):
+            return optimistic_update_incident(ir, incident_id, changes, params.get('version'), query_parameter)
         payload = {
-            "changes": params.get('changes'),
+            "changes": changes,
             "version": params.get('version')
         }
         payload = check_payload(payload)
-        logger.debug("Payload {0}".format(payload))
-        response = ir.make_rest_call(endpoint, 'PATCH', params=query_parameter, data=json.dumps(payload))
+        logger.debug("Payload %s", LogPreview(payload))
+        response = ir.make_rest_call(endpoint, 'PATCH', params=query_parameter, data=json_dumps(payload))
         return response
     except Exception as err:
         raise ConnectorError(str(err))
 
 
+def optimistic_update_incident(ir, incident_id, changes, version=None, query_params=None):
+    """
+    PATCH without reading the incident first. Old values not supplied by the caller are taken from the
+    cached incident when there is one; on a conflict patch_incident re-reads the incident, rebuilds those
+    old values and the version from it and retries. Old values and a version supplied by the caller are
+    conditions of the update: when the incident no longer matches them the conflict is raised instead.
+    """
+    known = cached_incident(ir, incident_id) or {}
+
+    def build_changes(incident):
+        fresh = incident is not known
+        if fresh and version is not None and incident.get('vers') != version:
+            raise ConnectorError("409:Incident {0} is at version {1}, not {2}".format(
+                incident_id, incident.get('vers'), version))
+        patched = []
+        for change in changes or []:
+            field = change.get('field')
+            name = field.get('name') if isinstance(field, dict) else field
+            current = _old_value(incident, name, change.get('new_value'))
+            if 'old_value' in change:
+                if fresh and _handle_value(change['old_value']) != _handle_value(current):
+                    raise ConnectorError("409:Field {0} of incident {1} was changed to {2}".format(
+                        name, incident_id, json.dumps(_handle_value(current))))
+            elif fresh or name in incident:
+                change = dict(change, old_value=current)
+            patched.append(change)
+        payload = {"changes": patched, "version": incident.get('vers') if version is None else version}
+        return check_payload(payload)
+
+    return patch_incident(ir, incident_id, build_changes, incident=known, query_params=query_params)
+
+
+def _handle_value(value):
+    # {"id": 5}, {"text": "x"} and the like, as the plain value they carry
+    if isinstance(value, dict) and len(value) == 1:
+        return next(iter(value.values()))
+    return value
+
+
+def _close_changes(incident):
+    if incident.get('plan_status') == 'C':
+        raise BulkSkip('Incident is already closed.')
+    if not incident.get('resolution_id') or not incident.get('resolution_summary'):
+        raise BulkSkip(CLOSE_RESOLUTION_REQUIRED)
+    return {
+        "changes": [
+            {
+                "field": "plan_status",
+                "old_value": {"text": incident.get('plan_status')},
+                "new_value": {"text": "C"}
+            }
+        ]
+    }
+
+
+def optimistic_close_incident(ir, incident_id):
+    """
+    Close an incident assuming the cached (or else active) status, only reading it when the PATCH fails.
+    """
+    known = cached_incident(ir, incident_id) or {"plan_status": "A"}
+
+    def build_changes(incident):
+        if incident is known:
+            return {"changes": [{"field": "plan_status", "old_value": {"text": known.get('plan_status')},
+                                 "new_value": {"text": "C"}}]}
+        return _close_changes(incident)
+
+    try:
+        return patch_incident(ir, incident_id, build_changes, incident=known)
+    except BulkSkip as skip:
+        return str(skip)
+    except ConnectorError:
+        # A missing resolution is rejected by the server; report it the same way as the pre-read path does
+        incident = ir.make_rest_call('/incidents/{0}'.format(incident_id), 'GET')
+        if not incident.get('resolution_id') or not incident.get('resolution_summary'):
+            return CLOSE_RESOLUTION_REQUIRED
+        raise
+
+
 def close_incident(config, params):
     try:
         ir = IBMResilient(config)
         incident_id = params.get('incident_id')
+        if params.get('optimistic_update'):
+            return optimistic_close_incident(ir, incident_id)
         incident_details = get_incident_details(config, params={'incident_id': incident_id})
         if not incident_details['resolution_id'] or not incident_details['resolution_summary']:
-            return 'Resolution and resolution summary of the incident should be updated before closing an incident.'
+            return CLOSE_RESOLUTION_REQUIRED
         old_incident_status = incident_details['plan_status']
         data = {
             "changes": [
@@ -222,15 +1103,213 @@ def close_incident(config, params):
             ]
         }
         endpoint = '/incidents/{0}'.format(incident_id)
-        logger.debug("Payload {0}".format(data))
-        response = ir.make_rest_call(endpoint, 'PATCH', data=json.dumps(data))
+        logger.debug("Payload %s", LogPreview(data))
+        response = ir.make_rest_call(endpoint, 'PATCH', data=json_dumps(data))
         return response
     except Exception as err:
         raise ConnectorError(str(err))
 
 
+def parse_incident_ids(incident_ids):
+    """
+    Accept a list of incident IDs or a comma separated string of them.
+    """
+    if not incident_ids:
+        return []
+    if isinstance(incident_ids, (int, str)):
+        incident_ids = str(incident_ids).split(',')
+    ids = [str(incident_id).strip() for incident_id in incident_ids if str(incident_id).strip()]
+    return [int(incident_id) if incident_id.isdigit() else incident_id for incident_id in ids]
+
+
+def selection_filters(filters):
+    """
+    Filters that select the incidents of a bulk change, with empty template values removed. A filter
+    without conditions matches every incident, so such filters are dropped and at least one must remain.
+    """
+    filters = check_payload(filters) if filters else []
+    if isinstance(filters, dict):
+        filters = [filters]
+    filters = [f for f in filters if isinstance(f, dict) and f.get('conditions')]
+    if not filters:
+        raise ConnectorError("Either incident IDs or filters with at least one condition must be specified.")
+    for f in filters:
+        for condition in f['conditions']:
+            if not condition.get('field_name') or not condition.get('method'):
+                raise ConnectorError("Filter condition {0} must specify a field name and a method.".format(
+                    json.dumps(condition)))
+    return filters
+
+
+def fetch_incidents(config, params):
+    """
+    Yield the current state of the incidents named by params["incident_ids"], fetched in batches,
+    or of the incidents matching params["filters"].
+    """
+    incident_ids = parse_incident_ids(params.get('incident_ids'))
+    if not incident_ids:
+        filters = selection_filters(params.get('filters'))
+        # Collect every match before the caller changes any of them: an incident that is updated can drop
+        # out of the filter and shift the offsets of the pages that were not read yet
+        for page in iter_incident_pages(config, {"filters": filters,
+                                                 "logic_type": params.get('logic_type'),
+                                                 "sorts": [{"field_name": "id", "type": "asc"}],
+                                                 "fields": "id",
+                                                 "concurrent_pages": params.get('concurrency')}):
+            incident_ids.extend(incident.get('id') for incident in page)
+    for i in range(0, len(incident_ids), BULK_FETCH_BATCH_SIZE):
+        batch = incident_ids[i:i + BULK_FETCH_BATCH_SIZE]
+        filters = [{"conditions": [{"field_name": "id", "method": "in", "value": batch}]}]
+        for page in iter_incident_pages(config, {"filters": filters, "length": len(batch)}):
+            for incident in page:
+                yield incident
+
+
+class BulkSkip(Exception):
+    pass
+
+
+def _is_conflict(err):
+    return str(err).startswith('409')
+
+
+def _old_value(incident, field, new_value):
+    """
+    Current value of an incident field, in the same {type: value} form as new_value.
+    """
+    value_type = next(iter(new_value)) if isinstance(new_value, dict) and new_value else 'text'
+    if isinstance(field, dict):
+        field = field.get('name')
+    if field in incident:
+        value = incident.get(field)
+    else:
+        value = (incident.get('properties') or {}).get(field)
+    return {value_type: value}
+
+
+def patch_incident(ir, incident_id, build_changes, incident=None, query_params=None):
+    """
+    PATCH an incident with the changes build_changes(incident) returns for its current state. When the
+    server reports a conflict the incident is read again and the changes rebuilt, up to CONFLICT_RETRIES times.
+    """
+    endpoint = '/incidents/{0}'.format(incident_id)
+    attempt = 0
+    while True:
+        if incident is None:
+            incident = ir.make_rest_call(endpoint, 'GET')
+        changes = build_changes(incident)
+        try:
+            response = ir.make_rest_call(endpoint, 'PATCH', params=query_params, data=json_dumps(changes))
+            conflict = isinstance(response, dict) and response.get('success') is False
+            if not conflict:
+                return response
+            err = ConnectorError("409:{0}".format(response.get('message') or response))
+        except ConnectorError as e:
+            if not _is_conflict(e):
+                raise
+            err = e
+        if attempt >= CONFLICT_RETRIES:
+            raise err
+        logger.warning("Conflict updating incident {0}, retrying with its latest state".format(incident_id))
+        attempt += 1
+        incident = None
+
+
+def _run_bulk(config, params, build_changes, query_params=None):
+    """
+    Apply build_changes to every selected incident with bounded concurrency and summarise the outcome.
+    """
+    ir = IBMResilient(config)
+    summary = {"total": 0, "succeeded": [], "skipped": {}, "failed": {}}
+    requested_ids = [str(incident_id) for incident_id in parse_incident_ids(params.get('incident_ids'))]
+
+    def update(incident):
+        return patch_incident(ir, incident.get('id'), build_changes, incident=incident, query_params=query_params)
+
+    concurrency = params.get('concurrency') or BULK_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        futures = {}
+        for incident in fetch_incidents(config, params):
+            futures[str(incident.get('id'))] = executor.submit(update, incident)
+        for incident_id, future in futures.items():
+            try:
+                future.result()
+                summary["succeeded"].append(incident_id)
+            except BulkSkip as skip:
+                summary["skipped"][incident_id] = str(skip)
+            except Exception as err:
+                logger.error("Failed to update incident {0}: {1}".format(incident_id, err))
+                summary["failed"][incident_id] = str(err)
+
+    for incident_id in requested_ids:
+        if incident_id not in futures:
+            summary["failed"][incident_id] = "Incident not found"
+    summary["total"] = len(summary["succeeded"]) + len(summary["skipped"]) + len(summary["failed"])
+    return summary
+
+
+def bulk_update_incidents(config, params):
+    try:
+        changes = params.get('changes')
+        if not changes:
+            raise ConnectorError("Changes are required.")
+
+        def build_changes(incident):
+            return {
+                "changes": [dict(change, old_value=_old_value(incident, change.get('field'), change.get('new_value')))
+                            for change in changes],
+                "version": incident.get('vers')
+            }
+
+        return _run_bulk(config, params, build_changes)
+    except Exception as err:
+        raise ConnectorError(str(err))
+
+
+def bulk_close_incidents(config, params):
+    try:
+        return _run_bulk(config, params, _close_changes)
+    except Exception as err:
+        raise ConnectorError(str(err))
+
+
+def iter_incident_artifact_pages(config, params):
+    """
+    Yield every page of an incident's artifacts from /artifacts/query_paged, like a cursor.
+    """
+    ir = IBMResilient(config)
+    endpoint = '/incidents/{0}/artifacts/query_paged'.format(params.get('incident_id'))
+    query_params = {
+        "include_records_total": True,
+        "return_level": params.get('return_level').lower() if params.get('return_level') else '',
+        "field_handle": params.get('field_handle'),
+        "handle_format": params.get('handle_format')
+    }
+    query_params = {k: v for k, v in query_params.items() if v is not None and v != ''}
+    fields = parse_fields(params.get('fields'))
+    apply_field_projection(query_params, fields)
+    payload = {
+        "sorts": params.get('sorts'),
+        "filters": params.get('filters'),
+        "logic_type": params.get('logic_type').lower() if params.get('logic_type') else ''
+    }
+    return iter_query_paged(ir, endpoint, payload, query_params,
+                            start=params.get('start') or 0,
+                            batch_size=params.get('length') or ARTIFACT_PAGE_SIZE,
+                            max_records=params.get('max_records'),
+                            concurrency=params.get('concurrent_pages') or 1,
+                            fields=fields)
+
+
 def get_incident_artifacts(config, params):
     try:
+        if params.get('fetch_all'):
+            artifacts = []
+            for page in iter_incident_artifact_pages(config, params):
+                artifacts.extend(page)
+            logger.info("Total artifacts retrieved: {0}".format(len(artifacts)))
+            return {"recordsTotal": len(artifacts), "data": artifacts}
+
         ir = IBMResilient(config)
         endpoint = '/incidents/{0}/artifacts/query_paged'.format(params.pop('incident_id'))
         query_params = {
@@ -239,6 +1318,8 @@ def get_incident_artifacts(config, params):
             "field_handle": params.get('field_handle')
         }
         query_params = {k: v for k, v in query_params.items() if v is not None and v != ''}
+        fields = parse_fields(params.get('fields'))
+        apply_field_projection(query_params, fields)
         payload = {
             "start": params.get('start'),
             "length": params.get('length'),
@@ -248,20 +1329,120 @@ def get_incident_artifacts(config, params):
             "logic_type": params.get('logic_type').lower() if params.get('logic_type') else ''
         }
         payload = check_payload(payload)
-        logger.debug("Query Parameters {0}".format(query_params))
-        logger.debug("Payload {0}".format(payload))
-        response = ir.make_rest_call(endpoint, 'POST', params=query_params, data=json.dumps(payload))
+        logger.debug("Query Parameters %s", LogPreview(query_params))
+        logger.debug("Payload %s", LogPreview(payload))
+        response = ir.make_rest_call(endpoint, 'POST', params=query_params, data=json_dumps(payload))
+        if fields and isinstance(response, dict) and response.get('data'):
+            response['data'] = project_records(response['data'], fields)
         return response
     except Exception as err:
         raise ConnectorError(str(err))
 
 
+def _artifact_type(artifact_type):
+    """
+    Artifact type given as a name, an ID or a {"name": ...} / {"id": ...} handle, as a plain name or ID.
+    """
+    if isinstance(artifact_type, dict):
+        return artifact_type.get('name') or artifact_type.get('id')
+    return artifact_type
+
+
+def _artifact_key(artifact_type, value):
+    return str(_artifact_type(artifact_type)).strip().lower(), str(value).strip()
+
+
+def _is_artifact_type_id(artifact_type):
+    return isinstance(artifact_type, int) or (isinstance(artifact_type, str) and artifact_type.strip().isdigit())
+
+
+def resolve_artifact_type_ids(ir, artifacts):
+    """
+    Replace artifact types given as IDs by their names, the form in which existing artifacts are listed.
+    """
+    type_ids = {int(_artifact_type(artifact['type'])) for artifact in artifacts
+                if _is_artifact_type_id(_artifact_type(artifact['type']))}
+    if not type_ids:
+        return artifacts
+    definition = get_field_definitions(ir, 'artifact').get((None, 'type')) or {}
+    names = {choice.get('value'): choice.get('label') for choice in definition.get('values') or []}
+    unknown = sorted(type_ids - set(names))
+    if unknown:
+        raise ConnectorError("Unknown artifact type IDs: {0}".format(', '.join(str(i) for i in unknown)))
+    return [dict(artifact, type={"name": names[int(_artifact_type(artifact['type']))]})
+            if _is_artifact_type_id(_artifact_type(artifact['type'])) else artifact for artifact in artifacts]
+
+
+def bulk_add_artifacts(config, params):
+    """
+    Add artifacts to an incident, skipping those whose (type, value) the incident already has. The input
+    is processed BULK_FETCH_BATCH_SIZE artifacts at a time: one query_paged lookup of the existing artifacts
+    with those values, then the new ones are created with bounded concurrency.
+    """
+    try:
+        ir = IBMResilient(config)
+        incident_id = params.get('incident_id')
+        artifacts = params.get('artifacts') or []
+        if isinstance(artifacts, str):
+            artifacts = json.loads(artifacts)
+        if not incident_id or not artifacts:
+            raise ConnectorError("Incident ID and at least one artifact are required.")
+        concurrency = max(1, int(params.get('concurrency') or BULK_CONCURRENCY))
+        endpoint = '/incidents/{0}/artifacts'.format(incident_id)
+
+        for artifact in artifacts:
+            if not artifact.get('type') or artifact.get('value') in (None, ''):
+                raise ConnectorError("Every artifact requires a type and a value: {0}".format(artifact))
+        # Existing artifacts are looked up by type name, so types given by ID are compared by their names
+        artifacts = resolve_artifact_type_ids(ir, artifacts)
+        unique = OrderedDict()
+        for artifact in artifacts:
+            unique.setdefault(_artifact_key(artifact['type'], artifact['value']), artifact)
+        summary = {"total": len(artifacts), "created": 0, "skipped": len(artifacts) - len(unique), "failed": [],
+                   "artifact_ids": []}
+
+        def create(artifact):
+            # Type IDs were resolved to names above
+            payload = check_payload(dict(artifact, type={"name": _artifact_type(artifact['type'])}))
+            return ir.make_rest_call(endpoint, 'POST', data=json_dumps(payload))
+
+        pending = list(unique.items())
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for i in range(0, len(pending), BULK_FETCH_BATCH_SIZE):
+                batch = pending[i:i + BULK_FETCH_BATCH_SIZE]
+                values = sorted({key[1] for key, _ in batch})
+                filters = [{"conditions": [{"field_name": "value", "method": "in", "value": values}]}]
+                existing = set()
+                for page in iter_incident_artifact_pages(config, {"incident_id": incident_id, "filters": filters,
+                                                                  "fields": "type,value", "handle_format": "names"}):
+                    existing.update(_artifact_key(found.get('type'), found.get('value')) for found in page)
+                new = [(key, artifact) for key, artifact in batch if key not in existing]
+                summary["skipped"] += len(batch) - len(new)
+                futures = [executor.submit(create, artifact) for _, artifact in new]
+                for (key, artifact), future in zip(new, futures):
+                    try:
+                        created = future.result()
+                    except Exception as err:
+                        logger.error("Failed to add artifact {0}: {1}".format(artifact.get('value'), err))
+                        summary["failed"].append({"type": _artifact_type(artifact['type']),
+                                                  "value": artifact.get('value'), "error": str(err)})
+                        continue
+                    summary["created"] += 1
+                    for item in created if isinstance(created, list) else [created]:
+                        if isinstance(item, dict) and item.get('id'):
+                            summary["artifact_ids"].append(item['id'])
+                logger.info("Unique artifacts processed: {0} of {1}".format(i + len(batch), len(pending)))
+        return summary
+    except Exception as err:
+        raise ConnectorError(str(err))
+
+
 def get_incident_notes(config, params):
     try:
         ir = IBMResilient(config)
         endpoint = '/incidents/{0}/comments'.format(params.pop('incident_id'))
         params = {k: v for k, v in params.items() if v is not None and v != ''}
-        logger.debug("Query Parameters {0}".format(params))
+        logger.debug("Query Parameters %s", LogPreview(params))
         response = ir.make_rest_call(endpoint, 'GET', params=params)
         return response
     except Exception as err:
@@ -276,13 +1457,39 @@ def get_incident_attachments(config, params):
         ir = IBMResilient(config)
         endpoint = '/incidents/{0}/attachments'.format(params.pop('incident_id'))
         params = {k: v for k, v in params.items() if v is not None and v != ''}
-        logger.debug("Query Parameters {0}".format(params))
+        logger.debug("Query Parameters %s", LogPreview(params))
         response = ir.make_rest_call(endpoint, 'GET', params=params)
         return response
     except Exception as err:
         raise ConnectorError(str(err))
 
 
+def download_attachment(ir, endpoint, file_path, max_file_size=None):
+    """
+    Stream an attachment body to file_path in chunks, aborting once max_file_size bytes are exceeded.
+    """
+    response = ir.make_rest_call(endpoint, 'GET', stream=True)
+    size = 0
+    try:
+        content_length = response.headers.get('Content-Length')
+        if max_file_size and content_length and int(content_length) > max_file_size:
+            raise ConnectorError("Attachment size {0} bytes exceeds the maximum of {1} bytes".format(
+                content_length, max_file_size))
+        with open(file_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if max_file_size and size > max_file_size:
+                    raise ConnectorError("Attachment exceeds the maximum size of {0} bytes".format(max_file_size))
+                f.write(chunk)
+    except Exception:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    finally:
+        response.close()
+    return size
+
+
 def get_incident_attachment_details(config, params):
     try:
         ir = IBMResilient(config)
@@ -297,9 +1504,22 @@ def get_incident_attachment_details(config, params):
         if not attachments or not isinstance(attachments, list):
             return {"attachments": [], "message": "No attachments found for the incident."}
 
-        saved_attachments = []
-        tmp_dir = "/tmp"
+        max_downloads = params.get('max_concurrent_downloads') or DEFAULT_CONCURRENT_DOWNLOADS
+        max_file_size = params.get('max_file_size')
+        max_file_size = int(max_file_size) * 1024 * 1024 if max_file_size else None
 
+        store = None
+        if params.get('use_attachment_store'):
+            from .attachment_store import AttachmentStore
+            quota = params.get('attachment_store_quota')
+            store = AttachmentStore(ATTACHMENT_STORE_DIR, int(quota) * 1024 * 1024) if quota else \
+                AttachmentStore(ATTACHMENT_STORE_DIR)
+
+        # Each call gets its own directory so concurrent runs never overwrite each other's files
+        download_dir = tempfile.mkdtemp(prefix='ibm-soar-{0}-'.format(incident_id))
+
+        downloads = []
+        used_names = set()
         for attachment in attachments:
             attachment_id = attachment.get('id')
             attachment_name = attachment.get('name')
@@ -307,83 +1527,429 @@ def get_incident_attachment_details(config, params):
                 logger.warning(f"Skipping attachment with missing ID or name: {attachment}")
                 continue
 
-            attachment_content_endpoint = f'/incidents/{incident_id}/attachments/{attachment_id}/contents'
-            response = ir.make_rest_call(attachment_content_endpoint, 'GET')
+            sanitized_name = attachment_name.replace("/", "_").replace("\\", "_")  # Avoid invalid file names
+            if sanitized_name in used_names:
+                sanitized_name = f"{attachment_id}_{sanitized_name}"
+            used_names.add(sanitized_name)
+            downloads.append((attachment, attachment_name, os.path.join(download_dir, sanitized_name)))
+
+        def fetch(download):
+            attachment, attachment_name, file_path = download
+            endpoint = f'/incidents/{incident_id}/attachments/{attachment.get("id")}/contents'
+            if store is None:
+                return download_attachment(ir, endpoint, file_path, max_file_size), False
+            expected_size = attachment.get('size')
+            if max_file_size and expected_size and int(expected_size) > max_file_size:
+                raise ConnectorError("Attachment size {0} bytes exceeds the maximum of {1} bytes".format(
+                    expected_size, max_file_size))
+            key = store.attachment_key(ir.url, incident_id, attachment)
+            blob_path, size, downloaded = store.fetch(ir, endpoint, key, expected_size, max_file_size)
+            store.link_or_copy(blob_path, file_path)
+            return size, not downloaded
+
+        saved_attachments = []
+        failed_attachments = []
+        with ThreadPoolExecutor(max_workers=max(1, int(max_downloads))) as executor:
+            futures = [executor.submit(fetch, download) for download in downloads]
+            for (attachment, attachment_name, file_path), future in zip(downloads, futures):
+                attachment_id = attachment.get('id')
+                try:
+                    size, from_store = future.result()
+                except Exception as err:
+                    logger.error(f"Failed to download attachment {attachment_id}: {err}")
+                    failed_attachments.append({
+                        "attachment_id": attachment_id,
+                        "attachment_name": attachment_name,
+                        "error": str(err)
+                    })
+                    continue
+                logger.info(f"Attachment saved: {file_path}")
+                saved_attachments.append({
+                    "attachment_id": attachment_id,
+                    "attachment_name": attachment_name,
+                    "file_path": file_path,
+                    "size": size,
+                    "from_store": from_store
+                })
+        if store is not None:
+            store.evict()
+
+        if failed_attachments and not saved_attachments:
+            os.rmdir(download_dir)
+            raise ConnectorError("; ".join("{0}: {1}".format(failed["attachment_name"], failed["error"])
+                                           for failed in failed_attachments))
+        result = {"attachments": saved_attachments, "download_dir": download_dir}
+        if failed_attachments:
+            result["failed_attachments"] = failed_attachments
+        return result
+    except Exception as err:
+        raise ConnectorError(str(err))
+
+
+class MultipartFileStream(object):
+    """
+    multipart/form-data body carrying one file, read from disk while it is sent so that memory use does not
+    depend on the file size. The total length is known up front, so the request has a Content-Length.
+    """
+
+    def __init__(self, file_path, field_name='file', progress=None):
+        import mimetypes
+        boundary = os.urandom(16).hex()
+        file_name = os.path.basename(file_path)
+        content_type = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+        self.content_type = 'multipart/form-data; boundary={0}'.format(boundary)
+        self.head = ('--{0}\r\nContent-Disposition: form-data; name="{1}"; filename="{2}"\r\n'
+                     'Content-Type: {3}\r\n\r\n').format(boundary, field_name, file_name.replace('"', '%22'),
+                                                       content_type).encode('utf-8')
+        self.tail = '\r\n--{0}--\r\n'.format(boundary).encode('utf-8')
+        self.file_size = os.path.getsize(file_path)
+        self.file = open(file_path, 'rb')
+        self.progress = progress
+        self.position = 0
 
-            if isinstance(response, requests.Response):
-                attachment_content = response.content  # Use .content to handle binary data
+    def __len__(self):
+        return len(self.head) + self.file_size + len(self.tail)
+
+    def read(self, size=-1):
+        total = len(self)
+        if size is None or size < 0:
+            size = total - self.position
+        file_start = len(self.head)
+        file_end = file_start + self.file_size
+        chunks = []
+        while size > 0 and self.position < total:
+            if self.position < file_start:
+                chunk = self.head[self.position:self.position + size]
+            elif self.position < file_end:
+                chunk = self.file.read(min(size, file_end - self.position))
+                if not chunk:
+                    raise ConnectorError("{0} changed while it was being uploaded".format(self.file.name))
+                if self.progress is not None:
+                    self.progress(len(chunk))
             else:
-                attachment_content = response  # Assuming this is raw content
+                chunk = self.tail[self.position - file_end:self.position - file_end + size]
+            self.position += len(chunk)
+            size -= len(chunk)
+            chunks.append(chunk)
+        return b''.join(chunks)
 
-            sanitized_name = attachment_name.replace("/", "_").replace("\\", "_")  # Avoid invalid file names
-            file_path = os.path.join(tmp_dir, sanitized_name)
-            with open(file_path, 'wb') as f:
-                f.write(attachment_content)
+    def seek(self, offset):
+        """
+        Rewind the body so that a retried request sends it again from the start.
+        """
+        file_offset = max(0, min(offset - len(self.head), self.file_size))
+        if self.progress is not None:
+            self.progress(file_offset - self.file.tell())
+        self.position = offset
+        self.file.seek(file_offset)
+
+    def close(self):
+        self.file.close()
+
+
+class UploadProgress(object):
+    """
+    Byte counter shared by concurrent uploads that logs overall progress and throughput at most every
+    UPLOAD_PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, total_bytes):
+        self.total_bytes = total_bytes
+        self.sent = 0
+        self.started = self.logged = time.monotonic()
+        self.lock = threading.Lock()
 
-            logger.info(f"Attachment saved: {file_path}")
+    def __call__(self, count):
+        with self.lock:
+            self.sent += count
+            now = time.monotonic()
+            if now - self.logged < UPLOAD_PROGRESS_INTERVAL:
+                return
+            self.logged = now
+            sent = self.sent
+        logger.info("Uploaded {0} of {1} bytes ({2:.0f}%) at {3:.0f} bytes/s".format(
+            sent, self.total_bytes, 100.0 * sent / (self.total_bytes or 1), sent / max(now - self.started, 1e-6)))
+
+
+def upload_attachment(ir, incident_id, file_path, progress=None):
+    """
+    Stream a file from disk to the attachments of an incident and return the created attachment.
+    """
+    body = MultipartFileStream(file_path, progress=progress)
+    try:
+        return ir.make_rest_call('/incidents/{0}/attachments'.format(incident_id), 'POST', data=body,
+                                 headers={'Content-Type': body.content_type})
+    finally:
+        body.close()
+
+
+def upload_incident_attachments(config, params):
+    try:
+        ir = IBMResilient(config)
+        incident_id = params.get('incident_id')
+        file_paths = params.get('file_paths') or []
+        if isinstance(file_paths, str):
+            file_paths = file_paths.split(',')
+        file_paths = [file_path.strip() for file_path in file_paths if file_path and file_path.strip()]
+        if not incident_id or not file_paths:
+            raise ConnectorError("Incident ID and at least one file path are required.")
+        missing = [file_path for file_path in file_paths if not os.path.isfile(file_path)]
+        if missing:
+            raise ConnectorError("Files not found: {0}".format(', '.join(missing)))
+        max_uploads = params.get('max_concurrent_uploads') or DEFAULT_CONCURRENT_UPLOADS
+        progress = UploadProgress(sum(os.path.getsize(file_path) for file_path in file_paths))
 
-            saved_attachments.append({
-                "attachment_id": attachment_id,
-                "attachment_name": attachment_name,
-                "file_path": file_path
-            })
+        def upload(file_path):
+            started = time.monotonic()
+            attachment = upload_attachment(ir, incident_id, file_path, progress)
+            return attachment, time.monotonic() - started
 
-        return {"attachments": saved_attachments}
+        uploaded = []
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, int(max_uploads))) as executor:
+            futures = [executor.submit(upload, file_path) for file_path in file_paths]
+            for file_path, future in zip(file_paths, futures):
+                try:
+                    attachment, seconds = future.result()
+                except Exception as err:
+                    logger.error("Failed to upload {0}: {1}".format(file_path, err))
+                    failed.append({"file_path": file_path, "error": str(err)})
+                    continue
+                size = os.path.getsize(file_path)
+                uploaded.append({
+                    "file_path": file_path,
+                    "size": size,
+                    "seconds": round(seconds, 3),
+                    "bytes_per_second": round(size / max(seconds, 1e-6)),
+                    "attachment": attachment
+                })
+        if failed and not uploaded:
+            # Nothing was attached, so the action failed rather than partially succeeded
+            raise ConnectorError("; ".join("{0}: {1}".format(item["file_path"], item["error"]) for item in failed))
+        seconds = time.monotonic() - progress.started
+        total_bytes = sum(item["size"] for item in uploaded)
+        logger.info("Uploaded {0} files, {1} bytes in {2:.1f}s".format(len(uploaded), total_bytes, seconds))
+        result = {
+            "uploaded": uploaded,
+            "total_bytes": total_bytes,
+            "seconds": round(seconds, 3),
+            "bytes_per_second": round(total_bytes / max(seconds, 1e-6))
+        }
+        if failed:
+            result["failed"] = failed
+        return result
     except Exception as err:
         raise ConnectorError(str(err))
 
 
+INCIDENT_SECTIONS = {
+    "tasks": {"method": "GET", "endpoint": "/incidents/{0}/tasks"},
+    "artifacts": {"method": "POST", "endpoint": "/incidents/{0}/artifacts/query_paged"},
+    "notes": {"method": "GET", "endpoint": "/incidents/{0}/comments"},
+    "attachments": {"method": "GET", "endpoint": "/incidents/{0}/attachments"}
+}
+
+
+def fetch_incident_section(config, ir, incident_id, key, params, artifact_pages=1):
+    """
+    Retrieve one of the INCIDENT_SECTIONS of an incident.
+    """
+    endpoint = INCIDENT_SECTIONS[key]["endpoint"].format(incident_id)
+    method = INCIDENT_SECTIONS[key]["method"]
+    if key == "artifacts":
+        # Artifacts require a POST request with payload
+        if not params.get("length"):
+            # Without an explicit length page through all artifacts instead of truncating
+            artifacts = []
+            for page in iter_incident_artifact_pages(config, {"incident_id": incident_id,
+                                                              "start": params.get("start"),
+                                                              "filters": params.get("filters"),
+                                                              "concurrent_pages": artifact_pages}):
+                artifacts.extend(page)
+            return {"recordsTotal": len(artifacts), "data": artifacts}
+        payload = {
+            "start": params.get("start", 0),
+            "length": params.get("length"),
+            "filters": params.get("filters", [])
+        }
+        payload = check_payload(payload)
+        return ir.make_rest_call(endpoint, method, data=json_dumps(payload))
+    # Tasks, notes, and attachments use GET requests; the artifact query inputs do not apply to them
+    query_params = {k: v for k, v in params.items() if k not in ("filters", "start", "length")}
+    return ir.make_rest_call(endpoint, method, params=query_params)
+
+
+def _future_result(future):
+    try:
+        return future.result()
+    except Exception as err:
+        return err
+
+
+def _collect_sections(incident_id, results):
+    """
+    Combine the section results of one incident, reporting failed sections under "errors".
+    """
+    combined_response = {}
+    errors = {}
+    for key, result in results.items():
+        if isinstance(result, Exception):
+            logger.error("Failed to retrieve {0} for incident {1}: {2}".format(key, incident_id, result))
+            combined_response[key] = None
+            errors[key] = str(result)
+        else:
+            combined_response[key] = result
+    if errors:
+        combined_response["errors"] = errors
+    return combined_response
+
+
+def fetch_sections(config, incident_ids, params, concurrency, artifact_pages=1):
+    """
+    Retrieve the INCIDENT_SECTIONS of each incident, either on the asyncio client when "Use Asynchronous
+    Client" is enabled and httpx is installed, or on a thread pool of "concurrency" workers.
+    Returns {incident_id: {section: result or exception}}.
+    """
+    if config.get('use_async_client'):
+        from . import async_client
+        if async_client.is_available():
+            return async_client.fetch_incident_sections(config, incident_ids, params, concurrency=concurrency)
+        logger.warning("httpx is not installed, falling back to the threaded client")
+
+    ir = IBMResilient(config)
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        futures = {
+            incident_id: {key: executor.submit(fetch_incident_section, config, ir, incident_id, key, params,
+                                               artifact_pages=artifact_pages)
+                          for key in INCIDENT_SECTIONS}
+            for incident_id in incident_ids
+        }
+        return {incident_id: {key: _future_result(future) for key, future in sections.items()}
+                for incident_id, sections in futures.items()}
+
+
 def get_all_incident_details(config, params):
     """
     Retrieve tasks, artifacts, notes, and attachments associated with a specific incident.
+    The sections are fetched concurrently; a section that fails is reported under "errors"
+    instead of failing the whole action.
     """
     try:
-        ir = IBMResilient(config)
         incident_id = params.pop('incidentID')
 
-        # Prepare endpoints and methods for each data type
-        endpoints = {
-            "tasks": {"method": "GET", "endpoint": f"/incidents/{incident_id}/tasks"},
-            "artifacts": {"method": "POST", "endpoint": f"/incidents/{incident_id}/artifacts/query_paged"},
-            "notes": {"method": "GET", "endpoint": f"/incidents/{incident_id}/comments"},
-            "attachments": {"method": "GET", "endpoint": f"/incidents/{incident_id}/attachments"}
-        }
+        # Fetch all sections concurrently so the total time is that of the slowest endpoint
+        sections = fetch_sections(config, [incident_id], params, concurrency=len(INCIDENT_SECTIONS),
+                                  artifact_pages=MAX_WORKERS)
+        combined_response = _collect_sections(incident_id, sections[incident_id])
 
-        # Initialize response dictionary
-        combined_response = {}
+        errors = combined_response.get("errors", {})
+        if len(errors) == len(INCIDENT_SECTIONS):
+            raise ConnectorError("; ".join("{0}: {1}".format(k, v) for k, v in errors.items()))
+        return combined_response
 
-        # Fetch data for each endpoint
-        for key, value in endpoints.items():
-            endpoint = value["endpoint"]
-            method = value["method"]
+    except Exception as err:
+        raise ConnectorError(str(err))
 
-            if key == "artifacts":
-                # Artifacts require a POST request with payload
-                payload = {
-                    "start": params.get("start", 0),
-                    "length": params.get("length", 50),
-                    "filters": params.get("filters", [])
-                }
-                payload = check_payload(payload)
-                response = ir.make_rest_call(endpoint, method, data=json.dumps(payload))
-            else:
-                # Tasks, notes, and attachments use GET requests
-                response = ir.make_rest_call(endpoint, method, params=params)
 
-            # Store each response in the combined dictionary
-            combined_response[key] = response
+def get_multiple_incident_details(config, params):
+    """
+    Retrieve tasks, artifacts, notes, and attachments metadata of several incidents, keyed by incident ID.
+    Every section of every incident shares one pool of at most "concurrency" requests in flight.
+    """
+    try:
+        incident_ids = parse_incident_ids(params.get('incident_ids'))
+        if not incident_ids:
+            raise ConnectorError("Incident IDs are required.")
+        section_params = {"filters": params.get("filters"), "start": params.get("start"),
+                          "length": params.get("length")}
+        sections = fetch_sections(config, incident_ids, section_params,
+                                  concurrency=params.get('concurrency') or BULK_CONCURRENCY)
+        return {str(incident_id): _collect_sections(incident_id, results)
+                for incident_id, results in sections.items()}
+    except Exception as err:
+        raise ConnectorError(str(err))
 
-        return combined_response
 
+def get_connector_metrics(config, params):
+    """
+    Return the latency, payload size, page and retry metrics recorded by this connector process.
+    """
+    try:
+        output_format = params.get('output_format') or 'JSON'
+        if params.get('log_metrics'):
+            metrics.log_metrics()
+        if output_format == 'Prometheus':
+            result = {"metrics": metrics.to_prometheus()}
+        else:
+            result = metrics.snapshot()
+        if params.get('reset'):
+            metrics.reset()
+        return result
     except Exception as err:
         raise ConnectorError(str(err))
 
 
+def _timed_probe(ir, endpoint, params):
+    response = ir.make_rest_call(endpoint, 'GET', params=params, stream=True)
+    try:
+        response.content  # Read the body so that the connection can be reused
+        return response.elapsed.total_seconds()
+    finally:
+        response.close()
+
+
+def probe_health(config, probe):
+    """
+    Send the probe request twice on a new session with the configuration's proxy and certificate settings:
+    the first request opens a connection and the second reuses it. server_response_seconds is the time
+    until the response headers of the second arrived, and connect_seconds the extra time the first took
+    to set up TCP, TLS and any proxy tunnel.
+    """
+    ir = IBMResilient(config)
+    ir.cache_ttl = 0  # A health check must reach the server
+    ir.session = _create_session()
+    endpoint, params = HEALTH_CHECK_PROBES[probe]
+    try:
+        started = time.monotonic()
+        first = _timed_probe(ir, endpoint, params)
+        total = time.monotonic() - started
+        reused = _timed_probe(ir, endpoint, params)
+    finally:
+        ir.session.close()
+    return {
+        "probe": probe,
+        "connect_seconds": round(max(0.0, first - reused), 4),
+        "server_response_seconds": round(reused, 4),
+        "total_seconds": round(total, 4)
+    }
+
+
 def check_health(config):
     try:
-        response = get_incident_simulations(config, params={"want_closed": True})
-        if response:
-            return True
+        probe = config.get('health_check_probe') or 'Organization'
+        if probe not in HEALTH_CHECK_PROBES:
+            raise ConnectorError("Unknown health check probe: {0}".format(probe))
+        ttl = config.get('health_check_ttl')
+        ttl = HEALTH_CHECK_TTL if ttl is None or ttl == '' else int(ttl)
+        # The secret is part of the key so that a configuration edited to wrong credentials is checked again
+        key = IBMResilient(config).session_key + (config.get('api_secret'), probe)
+        now = time.monotonic()
+        with _health_cache_lock:
+            entry = _health_cache.get(key)
+        if entry and entry[0] > now:
+            return dict(entry[1], cached=True)
+        result = probe_health(config, probe)
+        if config.get('enable_metrics'):
+            metrics.observe('health_check_seconds', result["total_seconds"], probe=probe)
+        if result["total_seconds"] > HEALTH_CHECK_SLOW:
+            logger.warning("Slow health check: {0}".format(json.dumps(result)))
+        else:
+            logger.info("Health check: {0}".format(json.dumps(result)))
+        if ttl > 0:
+            # Only successes are cached so that a recovered server is seen at the next check
+            with _health_cache_lock:
+                _health_cache[key] = (now + ttl, result)
+        return dict(result, cached=False)
     except Exception as err:
         logger.info(str(err))
         raise ConnectorError(str(err))
@@ -393,13 +1959,20 @@ operations = {
     'get_incident_tasks': get_incident_tasks,
     'create_incident': create_incident,
     'search_incidents': search_incidents,
+    'sync_incidents': sync_incidents,
     'get_incident_simulations': get_incident_simulations,
     'get_incident_details': get_incident_details,
     'update_incident': update_incident,
     'close_incident': close_incident,
+    'bulk_update_incidents': bulk_update_incidents,
+    'bulk_close_incidents': bulk_close_incidents,
     'get_incident_artifacts': get_incident_artifacts,
+    'bulk_add_artifacts': bulk_add_artifacts,
     'get_incident_notes': get_incident_notes,
     'get_incident_attachments': get_incident_attachments,
     'get_incident_attachment_details': get_incident_attachment_details,
-    'get_all_incident_details': get_all_incident_details
+    'upload_incident_attachments': upload_incident_attachments,
+    'get_all_incident_details': get_all_incident_details,
+    'get_multiple_incident_details': get_multiple_incident_details,
+    'get_connector_metrics': get_connector_metrics
 }
@@ -0,0 +1,67 @@
+"""
+Cost of check_payload on large create_incident payloads. The dict-only cleaner it replaced leaves objects inside
+lists alone, so the two are compared on a payload without lists; the payload with lists shows the extra cost of
+cleaning the artifacts and comments.
+
+    python tests/bench_check_payload.py --artifacts 2000
+"""
+
+from benchmark import compare, load, measure, parser, report
+
+
+def baseline_check_payload(payload):
+    # check_payload before it also cleaned objects inside lists
+    updated_payload = {}
+    for key, value in payload.items():
+        if isinstance(value, dict):
+            nested = baseline_check_payload(value)
+            if len(nested.keys()) > 0:
+                updated_payload[key] = nested
+        elif value != '' and value is not None:
+            updated_payload[key] = value
+    return updated_payload
+
+
+def incident_payload(artifacts, properties):
+    return {
+        "name": "Phishing report",
+        "description": {"format": "html", "content": "<p>" + "Reported message. " * 200 + "</p>"},
+        "discovered_date": 1700000000000,
+        "severity_code": {"name": "High"},
+        "owner_id": None,
+        "plan_status": "",
+        "incident_type_ids": [{"name": "Phishing"}, {"name": "Malware"}],
+        "properties": dict(("custom_{0}".format(i), "value" if i % 3 else "") for i in range(properties)),
+        "artifacts": [{"type": {"name": "IP Address"}, "value": "10.0.{0}.{1}".format(i // 256, i % 256),
+                       "description": "" if i % 2 else {"format": "text", "content": "Seen in headers"},
+                       "properties": [{"name": "source", "value": None}]} for i in range(artifacts)],
+        "comments": [{"text": {"format": "text", "content": "Note {0}".format(i)}, "parent_id": None}
+                     for i in range(artifacts // 10)]
+    }
+
+
+def main():
+    arguments = parser(__doc__)
+    arguments.add_argument('--artifacts', type=int, default=1000)
+    arguments.add_argument('--properties', type=int, default=200)
+    args = arguments.parse_args()
+
+    ops = load()
+    payload = incident_payload(args.artifacts, args.properties)
+    repeat = max(args.repeat, 200)
+    flat = {key: value for key, value in payload.items() if not isinstance(value, list)}
+    clean = ops.check_payload(payload)
+    results = [
+        measure("without lists: dict-only cleaner (baseline)", lambda: baseline_check_payload(flat), repeat=repeat),
+        measure("without lists: check_payload", lambda: ops.check_payload(flat), repeat=repeat),
+        measure("with lists: check_payload", lambda: ops.check_payload(payload), repeat=repeat,
+                count=lambda r: len(r["artifacts"]), unit='artifacts'),
+        measure("with lists: check_payload on a clean payload", lambda: ops.check_payload(clean), repeat=repeat,
+                count=lambda r: len(r["artifacts"]), unit='artifacts'),
+    ]
+    report(results, args.json)
+    compare(results[0], results[1])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Decoding and encoding of full-level incident pages with the stdlib json module, as every response and
+request body was before, and with json_loads/json_dumps on orjson. The end-to-end rows read the pages
+with search_incidents return_level=full, once with orjson switched off.
+
+    python tests/bench_json.py --records 1000 --incidents 10000
+"""
+
+import json, sys
+import requests
+from benchmark import MockServer, compare, full_incident, load, measure, parser, report
+
+
+def main():
+    arguments = parser(__doc__)
+    arguments.add_argument('--records', type=int, default=1000, help="records per page")
+    arguments.add_argument('--incidents', type=int, default=10000, help="incidents read end to end")
+    args = arguments.parse_args()
+
+    ops = load()
+    if ops.orjson is None:
+        sys.exit("orjson is not installed, so json_loads and json_dumps use the json module")
+    page = {"recordsTotal": args.records, "data": [full_incident(i) for i in range(1, args.records + 1)]}
+    content = json.dumps(page).encode('utf-8')
+
+    def response_json():
+        # What response.json() did: detect the encoding, decode to str, then parse the str
+        response = requests.models.Response()
+        response._content = content
+        response.headers['Content-Type'] = 'application/json'
+        return response.json()
+
+    results = [
+        measure("decode page: response.json() (before)", response_json, repeat=args.repeat),
+        measure("decode page: json_loads (after)", lambda: ops.json_loads(content), repeat=args.repeat),
+        measure("encode page: json.dumps (before)", lambda: json.dumps(page), repeat=args.repeat),
+        measure("encode page: json_dumps (after)", lambda: ops.json_dumps(page), repeat=args.repeat),
+    ]
+
+    def populate(soar):
+        for incident_id in range(1, args.incidents + 1):
+            soar.incidents[incident_id] = full_incident(incident_id)
+
+    with MockServer(populate) as server:
+        config = server.config()
+        params = {"return_level": "full", "length": args.records}
+        fast = ops.orjson
+        for name, codec in (("search_incidents full: json (before)", None),
+                            ("search_incidents full: orjson (after)", fast)):
+            ops.orjson = codec
+            try:
+                results.append(measure(name, lambda: ops.search_incidents(config, params), repeat=args.repeat,
+                                       count=len, unit='incidents'))
+            finally:
+                ops.orjson = fast
+    report(results, args.json)
+    for before, after in zip(results[::2], results[1::2]):
+        compare(before, after)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+CPU time and allocations of the response debug line in make_rest_call, formatted eagerly with str.format
+as before and deferred through LogPreview, for a 1000-record full-level query_paged page and a binary
+attachment, with DEBUG logging off and on.
+
+    python tests/bench_log_preview.py --attachment-mb 16
+"""
+
+import json, logging, os
+from benchmark import compare, full_incident, load, measure, parser, report
+
+
+def main():
+    arguments = parser(__doc__)
+    arguments.add_argument('--records', type=int, default=1000)
+    arguments.add_argument('--attachment-mb', type=int, default=8)
+    args = arguments.parse_args()
+
+    ops = load()
+    logger = logging.getLogger('bench-log-preview')
+    logger.propagate = False
+    logger.addHandler(logging.StreamHandler(open(os.devnull, 'w')))
+    bodies = [
+        ("query_paged page", json.dumps({"recordsTotal": args.records,
+                                         "data": [full_incident(i) for i in range(args.records)]}).encode()),
+        ("attachment", os.urandom(args.attachment_mb * 1024 * 1024)),
+    ]
+
+    def eager(content):
+        logger.debug("response_content {0}:{1}".format(200, content))
+
+    def lazy(content):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("response_content %s:%s", 200, ops.LogPreview(content))
+
+    results = []
+    for level in (logging.INFO, logging.DEBUG):
+        logger.setLevel(level)
+        for body_name, content in bodies:
+            for style, log in (("eager .format (before)", eager), ("LogPreview (after)", lazy)):
+                name = "{0}, {1}, {2}".format(body_name, logging.getLevelName(level), style)
+                results.append(measure(name, lambda: log(content), repeat=args.repeat))
+    report(results, args.json)
+    for before, after in zip(results[::2], results[1::2]):
+        compare(before, after)
+
+
+if __name__ == '__main__':
+    main()
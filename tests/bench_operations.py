@@ -0,0 +1,95 @@
+"""
+Throughput, latency percentiles and peak memory of each connector action against a MockSOAR.
+
+    python tests/bench_operations.py --incidents 20000 --latency 0.005 --throttle-every 50
+"""
+
+import os, shutil, sys, tempfile
+from benchmark import MockServer, load, measure, parser, report
+
+SAMPLE_INCIDENTS = 10  # Incidents that get tasks, notes, artifacts and attachments
+
+
+def populate(attachment_mb):
+    def setup(soar):
+        for incident_id in range(1, SAMPLE_INCIDENTS + 1):
+            soar.tasks[incident_id] = [{"id": incident_id * 100 + i, "name": "Task {0}".format(i)} for i in range(20)]
+            soar.comments[incident_id] = [{"id": incident_id * 100 + i, "text": "Note " * 50} for i in range(20)]
+            for i in range(50):
+                soar.add_artifact(incident_id, 1 + i % 4, "10.{0}.0.{1}".format(incident_id, i))
+        soar.add_attachment(1, os.urandom(attachment_mb * 1024 * 1024), "evidence.bin")
+        for i in range(4):
+            soar.add_attachment(2, os.urandom(256 * 1024), "small{0}.bin".format(i))
+    return setup
+
+
+def main():
+    arguments = parser(__doc__)
+    arguments.add_argument('--incidents', type=int, default=5000)
+    arguments.add_argument('--latency', type=float, default=0.002, help="seconds the server takes per request")
+    arguments.add_argument('--max-page-size', type=int, help="largest page the server returns")
+    arguments.add_argument('--throttle-every', type=int, help="answer every Nth request with 429")
+    arguments.add_argument('--attachment-mb', type=int, default=16)
+    args = arguments.parse_args()
+
+    ops = load()
+    work_dir = tempfile.mkdtemp(prefix='ibm-soar-bench-')
+    upload_path = os.path.join(work_dir, 'upload.bin')
+    with open(upload_path, 'wb') as f:
+        f.write(os.urandom(args.attachment_mb * 1024 * 1024))
+    ops.ATTACHMENT_STORE_DIR = os.path.join(work_dir, 'store')
+    ops.CHECKPOINT_DIR = os.path.join(work_dir, 'checkpoints')
+
+    def attachments(config, params):
+        result = ops.get_incident_attachment_details(config, params)
+        shutil.rmtree(result["download_dir"])
+        return sum(a["size"] for a in result["attachments"]) / 1048576.0
+
+    def ndjson(config):
+        result = ops.search_incidents(config, {"length": 1000, "output_to_file": True})
+        os.remove(result["file_path"])
+        return result["records_count"]
+
+    artifacts = [{"type": "IP Address", "value": "192.168.{0}.{1}".format(i // 256, i % 256)} for i in range(200)]
+    sample_ids = ','.join(str(i) for i in range(1, SAMPLE_INCIDENTS + 1))
+    bulk_ids = list(range(1, min(args.incidents, 200) + 1))
+    options = {"incidents": args.incidents, "latency": args.latency, "max_page_size": args.max_page_size,
+               "throttle_every": args.throttle_every}
+    results = []
+    with MockServer(populate(args.attachment_mb), **options) as server:
+        config = server.config()
+        benchmarks = [
+            ("search_incidents", lambda: ops.search_incidents(config, {"length": 1000}), len, 'records'),
+            ("search_incidents concurrent_pages=4",
+             lambda: ops.search_incidents(config, {"length": 1000, "concurrent_pages": 4}), len, 'records'),
+            ("search_incidents output_to_file", lambda: ndjson(config), int, 'records'),
+            ("sync_incidents", lambda: ops.sync_incidents(config, {"reset_checkpoint": True}),
+             lambda r: r["count"], 'records'),
+            ("get_incident_details", lambda: ops.get_incident_details(config, {"incident_id": 1}), None, None),
+            ("get_all_incident_details", lambda: ops.get_all_incident_details(config, {"incidentID": 1}),
+             None, None),
+            ("get_multiple_incident_details",
+             lambda: ops.get_multiple_incident_details(config, {"incident_ids": sample_ids}), len, 'incidents'),
+            ("get_incident_attachment_details",
+             lambda: attachments(config, {"incidentID": 1}), float, 'MiB'),
+            ("get_incident_attachment_details store",
+             lambda: attachments(config, {"incidentID": 1, "use_attachment_store": True}), float, 'MiB'),
+            ("upload_incident_attachments",
+             lambda: ops.upload_incident_attachments(config, {"incident_id": 3, "file_paths": [upload_path]}),
+             lambda r: r["total_bytes"] / 1048576.0, 'MiB'),
+            ("bulk_update_incidents",
+             lambda: ops.bulk_update_incidents(config, {"incident_ids": bulk_ids, "changes": [
+                 {"field": "severity_code", "new_value": {"id": 5}}]}), lambda r: len(r["succeeded"]), 'incidents'),
+            ("bulk_add_artifacts", lambda: ops.bulk_add_artifacts(config, {"incident_id": 4, "artifacts": artifacts}),
+             lambda r: r["total"], 'artifacts'),
+            ("check_health", lambda: ops.check_health(dict(config, health_check_ttl=0)), None, None),
+        ]
+        for name, call, count, unit in benchmarks:
+            results.append(measure(name, call, repeat=args.repeat, count=count, unit=unit))
+            print("done: {0}".format(name), file=sys.stderr, flush=True)
+    shutil.rmtree(work_dir)
+    report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Throughput of search_incidents reading every page of a large organization one page at a time, as it did
+before, and with the pages after the first fetched concurrently.
+
+    python tests/bench_prefetch.py --incidents 100000 --latency 0.05 --concurrency 2 4 8
+"""
+
+import sys
+from benchmark import MockServer, compare, load, measure, parser, report
+
+
+def main():
+    arguments = parser(__doc__)
+    arguments.add_argument('--incidents', type=int, default=100000)
+    arguments.add_argument('--latency', type=float, default=0.05, help="seconds the server takes per request")
+    arguments.add_argument('--length', type=int, default=1000, help="records per page")
+    arguments.add_argument('--concurrency', type=int, nargs='+', default=[2, 4, 8])
+    args = arguments.parse_args()
+
+    ops = load()
+    results = []
+    with MockServer(incidents=args.incidents, latency=args.latency) as server:
+        config = server.config()
+        for concurrency in [1] + args.concurrency:
+            name = "concurrent_pages={0}{1}".format(concurrency, " (before)" if concurrency == 1 else "")
+            params = {"length": args.length, "concurrent_pages": concurrency}
+            results.append(measure(name, lambda: ops.search_incidents(config, params), repeat=args.repeat,
+                                   count=len, unit='incidents'))
+            print("done: {0}".format(name), file=sys.stderr, flush=True)
+    report(results, args.json)
+    for result in results[1:]:
+        compare(results[0], result)
+
+
+if __name__ == '__main__':
+    main()
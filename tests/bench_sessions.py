@@ -0,0 +1,51 @@
+"""
+Latency of back-to-back requests with a new connection per call, as make_rest_call did with requests.request,
+against the keep-alive session shared through get_session. --tls serves the mock over HTTPS with a throwaway
+certificate, so that every new connection also pays for a TLS handshake.
+
+    python tests/bench_sessions.py --tls --calls 50
+"""
+
+import shutil, tempfile
+import requests
+from benchmark import MockServer, compare, load, measure, parser, report, self_signed_certificate
+
+ENDPOINT = '/incidents/1'
+
+
+def main():
+    arguments = parser(__doc__)
+    arguments.add_argument('--calls', type=int, default=20, help="requests made back to back by one benchmark call")
+    arguments.add_argument('--latency', type=float, default=0.0, help="seconds the server takes per request")
+    arguments.add_argument('--tls', action='store_true', help="serve HTTPS")
+    args = arguments.parse_args()
+
+    ops = load()
+    work_dir = tempfile.mkdtemp(prefix='ibm-soar-bench-')
+    certfile = self_signed_certificate(work_dir) if args.tls else None
+    results = []
+    with MockServer(lambda soar: soar.add_incident(), certfile=certfile, latency=args.latency) as server:
+        config = server.config(cache_ttl=0)
+
+        def unpooled():
+            # make_rest_call before the session registry: module-level requests.request, one connection per call
+            for _ in range(args.calls):
+                response = requests.request('GET', server.url + '/rest/orgs/201' + ENDPOINT, auth=("key", "secret"),
+                                            verify=False, headers={'Content-Type': 'application/json'})
+                response.json()
+            return args.calls
+
+        def pooled():
+            for _ in range(args.calls):
+                ops.IBMResilient(config).make_rest_call(ENDPOINT, 'GET')
+            return args.calls
+
+        for name, call in (("requests.request per call (before)", unpooled), ("pooled session (after)", pooled)):
+            results.append(measure(name, call, repeat=args.repeat, count=int, unit='requests'))
+    shutil.rmtree(work_dir)
+    report(results, args.json)
+    compare(*results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Cold start of a connector worker: import time of the connector module and latency of the first
+IBMResilient.execute and check_health calls, each measured in a fresh interpreter. "eager" imports
+operations together with the connector, as connector.py did before; "lazy" leaves it to the first call.
+
+    python tests/bench_startup.py --repeat 20
+"""
+
+import json, subprocess, sys
+from benchmark import ROOT, TESTS_DIR, MockServer, compare, parser, percentile, report
+
+WORKER = '''
+import importlib, json, sys, time
+sys.path[:0] = [{root!r}, {tests!r}]
+import fortisoar_sdk
+fortisoar_sdk.install()
+started = time.perf_counter()
+connector = importlib.import_module('ibm-security-qradar-soar.connector')
+if {eager!r}:
+    importlib.import_module('ibm-security-qradar-soar.operations')
+imported = time.perf_counter()
+connector.IBMResilient().{call}
+called = time.perf_counter()
+print(json.dumps({{"import": imported - started, "first_call": called - imported}}))
+'''
+
+CALLS = {
+    "execute": "execute(config, 'get_incident_details', {{'incident_id': 1}})",
+    "check_health": "check_health(config)",
+}
+
+
+def summary(name, samples):
+    return {"name": name, "runs": len(samples), "calls_per_second": round(len(samples) / sum(samples), 2),
+            "items_per_second": None, "unit": None,
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 4), "p95_ms": round(percentile(samples, 0.95) * 1000, 4),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 4), "peak_kib": 0.0}
+
+
+def main():
+    arguments = parser(__doc__)
+    args = arguments.parse_args()
+
+    results = []
+    with MockServer(lambda soar: soar.add_incident()) as server:
+        config = server.config()
+        for call_name, call in CALLS.items():
+            call = call.format().replace('config', repr(config))
+            for eager in (True, False):
+                code = WORKER.format(root=ROOT, tests=TESTS_DIR, eager=eager, call=call)
+                timings = [json.loads(subprocess.run([sys.executable, '-c', code], check=True, capture_output=True,
+                                                     text=True).stdout) for _ in range(args.repeat)]
+                style = "eager (before)" if eager else "lazy (after)"
+                results.append(summary("import connector, {0}".format(style), [t["import"] for t in timings]))
+                results.append(summary("first {0}, {1}".format(call_name, style), [t["first_call"] for t in timings]))
+                results.append(summary("import + first {0}, {1}".format(call_name, style),
+                                       [t["import"] + t["first_call"] for t in timings]))
+    report(results, args.json)
+    for index in range(0, len(results), 6):
+        for before, after in zip(results[index:index + 3], results[index + 3:index + 6]):
+            compare(before, after)
+
+
+if __name__ == '__main__':
+    main()
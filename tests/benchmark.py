@@ -0,0 +1,191 @@
+"""
+Harness shared by the bench_*.py scripts. The MockSOAR runs in a forked child process so that the measured
+process only runs the connector, and every benchmark reports:
+
+    calls/s      calls completed per second
+    items/s      records, MiB or other units handled per second, where the benchmark counts them
+    p50/p95/p99  call latency in milliseconds
+    peak KiB     largest Python heap growth during one call, measured by tracemalloc in a separate call
+
+Run a benchmark from the repository root, e.g. "python tests/bench_operations.py --incidents 20000".
+Pass --json FILE to keep the results and compare them with a later run.
+"""
+
+import argparse, importlib, json, logging, multiprocessing, os, subprocess, sys, time, tracemalloc, warnings
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTS_DIR)
+for path in (ROOT, TESTS_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import fortisoar_sdk  # noqa: E402
+
+fortisoar_sdk.install()
+
+from mock_soar import MockSOAR  # noqa: E402
+
+PACKAGE = 'ibm-security-qradar-soar'
+
+
+def load(module='operations'):
+    return importlib.import_module('{0}.{1}'.format(PACKAGE, module))
+
+
+class MockServer(object):
+    """
+    MockSOAR served from a child process. setup(soar) runs in the child before the server starts; with a
+    certfile it serves HTTPS.
+    """
+
+    def __init__(self, setup=None, certfile=None, **options):
+        self.setup = setup
+        self.certfile = certfile
+        self.options = dict(options, record_requests=False)
+        self.process = None
+        self.url = None
+
+    def _serve(self, queue):
+        soar = MockSOAR(**self.options)
+        if self.setup:
+            self.setup(soar)
+        soar.start(certfile=self.certfile)
+        queue.put(soar.url)
+        soar.thread.join()
+
+    def __enter__(self):
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        self.process = context.Process(target=self._serve, args=(queue,), daemon=True)
+        self.process.start()
+        self.url = queue.get(timeout=300)
+        return self
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
+
+    def config(self, **extra):
+        return dict({"server_url": self.url, "org_id": 201, "api_key": "key", "api_secret": "secret",
+                     "verify_ssl": False}, **extra)
+
+
+def self_signed_certificate(directory):
+    """
+    Write a throwaway certificate and key for 127.0.0.1 to one PEM file with the openssl command.
+    """
+    key_path, cert_path, path = (os.path.join(directory, name) for name in ('key.pem', 'cert.pem', 'mock_soar.pem'))
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj',
+                    '/CN=127.0.0.1', '-keyout', key_path, '-out', cert_path], check=True, capture_output=True)
+    with open(path, 'wb') as f:
+        for part in (cert_path, key_path):
+            with open(part, 'rb') as pem:
+                f.write(pem.read())
+    return path
+
+
+def full_incident(incident_id):
+    """
+    An incident shaped like the ones query_paged returns with return_level=full, about 3 KiB as JSON.
+    """
+    created = 1700000000000 + incident_id * 1000
+    return {
+        "id": incident_id, "name": "Suspicious login from unusual location #{0}".format(incident_id),
+        "description": "<div><p>User reported a login from an unrecognised device. " * 8 + "</p></div>",
+        "phase_id": 1000, "inc_training": False, "vers": 3, "addr": None, "city": None, "creator_id": 3,
+        "creator_principal": {"id": 3, "type": "user", "name": "analyst@example.com", "display_name": "Analyst"},
+        "exposure_type_id": 1, "incident_type_ids": [19, 21], "reporter": "SIEM", "state": None, "country": None,
+        "zip": None, "workspace": 1, "exposure": 0, "org_handle": 201, "members": [4, 7, 12],
+        "negative_pr_likely": None, "perms": {"read": True, "write": True, "comment": True, "assign": True,
+                                              "close": True, "change_members": True, "attach_file": True,
+                                              "read_attachments": True, "delete_attachments": True,
+                                              "create_milestones": True, "list_milestones": True,
+                                              "create_artifacts": True, "list_artifacts": True, "delete": True},
+        "confirmed": True, "task_changes": {"added": [], "removed": []}, "assessment": "<assessment/>" * 10,
+        "data_compromised": None, "draft": False, "properties": {"custom_{0}".format(i): "value {0}".format(i)
+                                                                 for i in range(20)},
+        "resolution_id": None, "resolution_summary": None, "pii": {"data_compromised": None, "data_contained": None,
+                                                                   "data_format": None, "data_source_ids": [],
+                                                                   "exposure": 0, "harmstatus_id": 2},
+        "gdpr": {"gdpr_breach_circumstances": [], "gdpr_breach_type": None, "gdpr_consequences": None,
+                 "gdpr_final_assessment": None, "gdpr_identification": None, "gdpr_personal_data": None},
+        "regulators": {"ids": [96]}, "hipaa": {"hipaa_acquired": None, "hipaa_additional_misuse": None},
+        "plan_status": "A", "severity_code": 5, "discovered_date": created, "create_date": created,
+        "inc_last_modified_date": created + 500, "owner_id": 4, "nist_attack_vectors": [4, 6],
+        "artifacts": None, "dtm": {}, "cm": {"unassigneds": [], "total": 0, "geo_counts": {}},
+        "comments": None, "timer_field_summarized_incident_data": []
+    }
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(name, call, repeat=5, warmup=1, count=None, unit='items'):
+    """
+    Time call() `repeat` times after `warmup` untimed calls. count(result) is the number of `unit` one call
+    handled. tracemalloc slows Python down, so peak memory is taken from one more call made separately.
+    """
+    for _ in range(warmup):
+        call()
+    latencies = []
+    items = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = call()
+        latencies.append(time.perf_counter() - started)
+        if count:
+            items += count(result)
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    total = sum(latencies)
+    return {
+        "name": name,
+        "runs": repeat,
+        "calls_per_second": round(repeat / total, 2),
+        "items_per_second": round(items / total, 1) if count else None,
+        "unit": unit if count else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+def report(results, json_path=None):
+    columns = ("name", "runs", "calls/s", "items/s", "p50 ms", "p95 ms", "p99 ms", "peak KiB")
+    rows = [(r["name"], r["runs"], r["calls_per_second"],
+             '{0} {1}'.format(r["items_per_second"], r["unit"]) if r["unit"] else '-',
+             r["p50_ms"], r["p95_ms"], r["p99_ms"], r["peak_kib"]) for r in results]
+    widths = [max(len(str(value)) for value in column) for column in zip(columns, *rows)]
+    for row in [columns] + rows:
+        print('  '.join(str(value).ljust(width) for value, width in zip(row, widths)))
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+def compare(before, after):
+    """
+    Print how much faster and lighter `after` is than `before`.
+    """
+    print("{0} vs {1}: p50 {2:.2f}x faster, throughput {3:.2f}x, peak memory {4:.2f}x".format(
+        after["name"], before["name"], before["p50_ms"] / max(after["p50_ms"], 1e-9),
+        after["calls_per_second"] / max(before["calls_per_second"], 1e-9),
+        after["peak_kib"] / max(before["peak_kib"], 1e-9)))
+
+
+def parser(description):
+    arguments = argparse.ArgumentParser(description=description)
+    arguments.add_argument('--repeat', type=int, default=5, help="timed calls per benchmark")
+    arguments.add_argument('--json', help="also write the results to this file")
+    # Retries of injected 429s are expected; only errors are worth showing between the results
+    logging.basicConfig(level=logging.ERROR)
+    # The mock serves HTTPS with a self-signed certificate and the benchmarks turn verification off
+    warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+    return arguments
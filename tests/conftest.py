@@ -0,0 +1,40 @@
+import importlib, os, sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fortisoar_sdk  # noqa: E402
+
+fortisoar_sdk.install()
+
+from mock_soar import MockSOAR  # noqa: E402
+
+PACKAGE = 'ibm-security-qradar-soar'
+
+
+@pytest.fixture
+def ops(monkeypatch, tmp_path):
+    pytest.importorskip('requests')
+    operations = importlib.import_module(PACKAGE + '.operations')
+    operations._response_cache.clear()
+    operations._type_cache.clear()
+    operations._token_buckets.clear()
+    operations._health_cache.clear()
+    monkeypatch.setattr(operations, 'RETRY_BACKOFF_FACTOR', 0.01)
+    monkeypatch.setattr(operations, 'CHECKPOINT_DIR', str(tmp_path / 'checkpoints'))
+    monkeypatch.setattr(operations, 'ATTACHMENT_STORE_DIR', str(tmp_path / 'attachments'))
+    return operations
+
+
+@pytest.fixture
+def soar():
+    server = MockSOAR().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def config(soar):
+    return {"server_url": soar.url, "org_id": 201, "api_key": "key", "api_secret": "secret", "verify_ssl": False}
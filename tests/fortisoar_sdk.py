@@ -0,0 +1,28 @@
+"""
+Stand-in for the parts of the FortiSOAR connector SDK the connector imports, used when the tests and
+benchmarks run outside a FortiSOAR node.
+"""
+
+import logging, sys, types
+
+
+def install():
+    try:
+        import connectors.core.connector  # noqa: F401
+        return
+    except ImportError:
+        pass
+
+    class ConnectorError(Exception):
+        pass
+
+    class Connector(object):
+        pass
+
+    sdk = types.ModuleType('connectors.core.connector')
+    sdk.ConnectorError = ConnectorError
+    sdk.Connector = Connector
+    sdk.get_logger = logging.getLogger
+    for name in ('connectors', 'connectors.core'):
+        sys.modules.setdefault(name, types.ModuleType(name))
+    sys.modules['connectors.core.connector'] = sdk
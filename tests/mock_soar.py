@@ -0,0 +1,435 @@
+"""
+Local stand-in for the QRadar SOAR REST endpoints used by the connector, for tests and load checks.
+
+Run it on its own with "python tests/mock_soar.py --incidents 10000" to point a connector configuration
+at it, or use MockSOAR from tests to start one on a free port.
+"""
+
+import argparse, base64, json, re, ssl, threading, time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ARTIFACT_TYPES = {1: "IP Address", 2: "DNS Name", 3: "URL", 4: "Malware MD5 Hash"}
+
+PATH_PATTERN = re.compile(r'^/rest/orgs/(\d+)(/.*)?$')
+
+
+class MockSOAR(object):
+    """
+    In-memory organization served over HTTP.
+
+    latency          seconds slept before every response
+    max_page_size    upper bound applied to the "length" of query_paged requests
+    support_range    honour "Range" headers on attachment contents
+    throttle_every   answer every Nth request with 429, as a rate-limited server does under load
+    record_requests  keep every request in self.requests; turn off for long load runs
+    credentials      (api_key, api_secret) that requests must authenticate with, if given
+    """
+
+    def __init__(self, incidents=0, latency=0.0, max_page_size=None, support_range=True, throttle_every=None,
+                 record_requests=True, credentials=None):
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.support_range = support_range
+        self.throttle_every = throttle_every
+        self.record_requests = record_requests
+        self.credentials = credentials
+        self.request_count = 0
+        self.lock = threading.RLock()
+        self.clock = 1000000
+        self.incidents = {}
+        self.tasks = {}
+        self.comments = {}
+        self.artifacts = {}
+        self.attachments = {}
+        self.requests = []  # (method, path, query, headers, body) of every request received
+        self.hooks = []  # callables(method, path, body) run after every request is handled
+        self._failures = deque()
+        self._drops = {}
+        for _ in range(incidents):
+            self.add_incident()
+        self.server = None
+        self.thread = None
+
+    # ---- state helpers ----
+
+    def tick(self):
+        with self.lock:
+            self.clock += 1
+            return self.clock
+
+    def add_incident(self, **fields):
+        with self.lock:
+            incident_id = fields.pop('id', None) or len(self.incidents) + 1
+            incident = {"id": incident_id, "name": "Incident {0}".format(incident_id), "plan_status": "A",
+                        "resolution_id": None, "resolution_summary": None, "vers": 1,
+                        "inc_last_modified_date": self.tick(), "properties": {}}
+            incident.update(fields)
+            self.incidents[incident_id] = incident
+            return incident
+
+    def modify_incident(self, incident_id, **fields):
+        with self.lock:
+            incident = self.incidents[incident_id]
+            incident.update(fields)
+            incident["vers"] += 1
+            incident["inc_last_modified_date"] = self.tick()
+            return incident
+
+    def add_artifact(self, incident_id, type_id, value, **fields):
+        with self.lock:
+            artifacts = self.artifacts.setdefault(incident_id, [])
+            artifact = dict(fields, id=sum(len(a) for a in self.artifacts.values()) + 1, type=type_id, value=value,
+                            inc_id=incident_id)
+            artifacts.append(artifact)
+            return artifact
+
+    def add_attachment(self, incident_id, content, name=None, **fields):
+        with self.lock:
+            attachments = self.attachments.setdefault(incident_id, {})
+            attachment_id = sum(len(a) for a in self.attachments.values()) + 1
+            meta = dict(fields, id=attachment_id, name=name or 'file{0}.bin'.format(attachment_id),
+                        size=len(content), created=self.tick(), inc_id=incident_id)
+            attachments[attachment_id] = (meta, content)
+            return meta
+
+    def fail(self, count=1, status=429, retry_after='0', path=None, method=None):
+        """
+        Answer the next `count` requests (with `method` and whose path contains `path`, if given) with `status`.
+        """
+        with self.lock:
+            for _ in range(count):
+                self._failures.append((status, retry_after, path, method))
+
+    def drop_after(self, attachment_id, byte_count, times=1):
+        """
+        Close the connection after sending byte_count bytes of the attachment's contents, `times` times.
+        """
+        with self.lock:
+            self._drops[attachment_id] = [byte_count, times]
+
+    def requests_to(self, method, path_pattern):
+        return [r for r in self.requests if r[0] == method and re.search(path_pattern, r[1])]
+
+    # ---- server lifecycle ----
+
+    def start(self, port=0, certfile=None):
+        """
+        Serve on 127.0.0.1, over HTTPS with the certificate and key in the PEM file certfile if it is given.
+        """
+        handler = type('Handler', (_Handler,), {"soar": self})
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.scheme = 'http'
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile)
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+            self.scheme = 'https'
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    @property
+    def url(self):
+        return '{0}://127.0.0.1:{1}'.format(self.scheme, self.server.server_address[1])
+
+    # ---- request handling ----
+
+    def _take_failure(self, method, path):
+        with self.lock:
+            for failure in list(self._failures):
+                if (failure[2] is None or failure[2] in path) and failure[3] in (None, method):
+                    self._failures.remove(failure)
+                    return failure
+        return None
+
+    def query(self, records, body, query):
+        filters = body.get('filters') or []
+        if filters:
+            # Groups are ORed; conditions in a group are ANDed unless the group or the query has logic_type any
+            combine = {f_index: any if (f.get('logic_type') or body.get('logic_type') or '').lower() == 'any'
+                       else all for f_index, f in enumerate(filters)}
+            records = [r for r in records if any(combine[i](_matches(r, c) for c in f.get('conditions') or [])
+                                                 for i, f in enumerate(filters))]
+        for sort in reversed(body.get('sorts') or []):
+            records = sorted(records, key=lambda r: _field(r, sort['field_name']),
+                             reverse=sort.get('type') == 'desc')
+        start = body.get('start') or 0
+        length = body.get('length') or len(records)
+        if self.max_page_size:
+            length = min(length, self.max_page_size)
+        return {"recordsTotal": len(records), "data": records[start:start + length]}
+
+    def patch_incident(self, incident_id, body):
+        incident = self.incidents.get(incident_id)
+        if incident is None:
+            return 404, {"message": "Incident not found"}
+        version = body.get('version')
+        if version is not None and version != incident['vers']:
+            return 409, {"message": "Incident has been modified"}
+        updates = {}
+        for change in body.get('changes') or []:
+            field = change['field']
+            field = field.get('name') if isinstance(field, dict) else field
+            if 'old_value' in change and _value(change['old_value']) != _field(incident, field):
+                return 409, {"message": "Field {0} has been modified".format(field)}
+            updates[field] = _value(change['new_value'])
+        if updates.get('plan_status') == 'C' and not (incident.get('resolution_id') and
+                                                       incident.get('resolution_summary')):
+            return 400, {"message": "Resolution is required to close an incident"}
+        for field, value in updates.items():
+            if field in incident:
+                incident[field] = value
+            else:
+                incident['properties'][field] = value
+        incident['vers'] += 1
+        incident['inc_last_modified_date'] = self.tick()
+        return 200, {"success": True, "entity": dict(incident)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    soar = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        soar = self.soar
+        parsed = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        with soar.lock:
+            soar.request_count += 1
+            throttled = soar.throttle_every and soar.request_count % soar.throttle_every == 0
+            if soar.record_requests:
+                soar.requests.append((method, parsed.path, query, dict(self.headers), raw))
+        if soar.latency:
+            time.sleep(soar.latency)
+        if soar.credentials and self.headers.get('Authorization') != _basic_auth(*soar.credentials):
+            return self._send(401, {"message": "Invalid credentials"})
+        failure = (429, '0') if throttled else soar._take_failure(method, parsed.path)
+        if failure:
+            status, retry_after = failure[:2]
+            return self._send(status, {"message": "Injected failure"},
+                              {'Retry-After': retry_after} if retry_after is not None else None)
+        match = PATH_PATTERN.match(parsed.path)
+        if not match:
+            return self._send(404, {"message": "Not found"})
+        path = match.group(2) or ''
+        is_json = raw and 'json' in (self.headers.get('Content-Type') or '')
+        body = json.loads(raw) if is_json else {}
+        with soar.lock:
+            result = self._route(method, path, query, body, raw)
+        if result is not None:
+            self._send(*result)
+        for hook in list(soar.hooks):
+            hook(method, path, body)
+
+    def _route(self, method, path, query, body, raw):
+        soar = self.soar
+        parts = path.strip('/').split('/') if path else []
+        if method == 'GET' and not parts:
+            return 200, {"id": 201, "name": "Mock organization"}
+        if parts[:2] == ['types', 'incident'] and method == 'GET':
+            return 200, INCIDENT_FIELDS
+        if parts[:2] == ['types', 'artifact'] and method == 'GET':
+            return 200, artifact_fields()
+        if parts[0] != 'incidents':
+            return 404, {"message": "Not found"}
+        if parts == ['incidents'] and method == 'POST':
+            return 200, soar.add_incident(**{k: v for k, v in body.items() if k != 'id'})
+        if parts == ['incidents', 'query_paged'] and method == 'POST':
+            return 200, soar.query(list(soar.incidents.values()), body, query)
+        if parts == ['incidents', 'simulations'] and method == 'GET':
+            return 200, []
+        if len(parts) < 2 or not parts[1].isdigit():
+            return 404, {"message": "Not found"}
+        incident_id = int(parts[1])
+        if incident_id not in soar.incidents:
+            return 404, {"message": "Incident not found"}
+        if len(parts) == 2:
+            if method == 'GET':
+                return 200, soar.incidents[incident_id]
+            if method == 'PATCH':
+                return soar.patch_incident(incident_id, body)
+        section = parts[2] if len(parts) > 2 else None
+        if section == 'tasks' and method == 'GET':
+            return 200, soar.tasks.get(incident_id, [])
+        if section == 'comments' and method == 'GET':
+            return 200, soar.comments.get(incident_id, [])
+        if section == 'artifacts':
+            artifacts = soar.artifacts.get(incident_id, [])
+            if parts[3:] == ['query_paged'] and method == 'POST':
+                if query.get('handle_format') == 'names':
+                    artifacts = [dict(a, type=ARTIFACT_TYPES.get(a['type'], a['type'])) for a in artifacts]
+                return 200, soar.query(artifacts, body, query)
+            if len(parts) == 3 and method == 'POST':
+                artifact_type = body.get('type') or {}
+                type_id = artifact_type.get('id') or next((k for k, v in ARTIFACT_TYPES.items()
+                                                           if v == artifact_type.get('name')), None)
+                if type_id is None:
+                    return 400, {"message": "Unknown artifact type"}
+                extra = {k: v for k, v in body.items() if k not in ('type', 'value')}
+                return 200, [soar.add_artifact(incident_id, type_id, body.get('value'), **extra)]
+        if section == 'attachments':
+            attachments = soar.attachments.get(incident_id, {})
+            if len(parts) == 3 and method == 'GET':
+                return 200, [meta for meta, _ in attachments.values()]
+            if len(parts) == 3 and method == 'POST':
+                name, content = _parse_multipart(self.headers.get('Content-Type'), raw)
+                return 200, soar.add_attachment(incident_id, content, name)
+            if len(parts) == 5 and parts[4] == 'contents' and method == 'GET':
+                attachment_id = int(parts[3])
+                if attachment_id not in attachments:
+                    return 404, {"message": "Attachment not found"}
+                self._send_contents(attachment_id, attachments[attachment_id][1])
+                return None
+        return 404, {"message": "Not found"}
+
+    def _send_contents(self, attachment_id, content):
+        soar = self.soar
+        start = 0
+        status = 200
+        range_header = self.headers.get('Range')
+        if range_header and soar.support_range:
+            start = int(re.match(r'bytes=(\d+)-', range_header).group(1))
+            if start >= len(content):
+                return self._send(416, {"message": "Range not satisfiable"})
+            status = 206
+        body = content[start:]
+        drop = soar._drops.get(attachment_id)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 206:
+            self.send_header('Content-Range', 'bytes {0}-{1}/{2}'.format(start, len(content) - 1, len(content)))
+        self.end_headers()
+        if drop and drop[1] > 0 and drop[0] < len(body):
+            drop[1] -= 1
+            self.wfile.write(body[:drop[0]])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self.wfile.write(body)
+
+
+def _basic_auth(user, password):
+    return 'Basic ' + base64.b64encode('{0}:{1}'.format(user, password).encode()).decode()
+
+
+def _field(record, name):
+    if name in record:
+        return record[name]
+    return (record.get('properties') or {}).get(name)
+
+
+def _value(value):
+    if isinstance(value, dict):
+        if 'ids' in value:
+            return value['ids']
+        return next(iter(value.values()), None) if value else None
+    return value
+
+
+def _matches(record, condition):
+    value = _field(record, condition.get('field_name'))
+    expected = condition.get('value')
+    method = condition.get('method')
+    if method == 'equals':
+        return value == expected
+    if method == 'not_equals':
+        return value != expected
+    if method == 'in':
+        return value in expected
+    if method == 'not_in':
+        return value not in expected
+    if method == 'contains':
+        return value is not None and str(expected) in str(value)
+    if value is None:
+        return False
+    if method == 'gt':
+        return value > expected
+    if method == 'gte':
+        return value >= expected
+    if method == 'lt':
+        return value < expected
+    if method == 'lte':
+        return value <= expected
+    raise ValueError("Unsupported filter method {0}".format(method))
+
+
+def _parse_multipart(content_type, raw):
+    boundary = content_type.split('boundary=')[1].encode()
+    part = raw.split(b'--' + boundary)[1]
+    headers, content = part.split(b'\r\n\r\n', 1)
+    name = re.search(rb'filename="([^"]*)"', headers).group(1).decode()
+    return name, content[:-2]
+
+
+INCIDENT_FIELDS = [
+    {"name": "name", "prefix": None, "input_type": "text"},
+    {"name": "plan_status", "prefix": None, "input_type": "select",
+     "values": [{"value": "A", "label": "Active"}, {"value": "C", "label": "Closed"}]},
+    {"name": "severity_code", "prefix": None, "input_type": "select",
+     "values": [{"value": 4, "label": "Low"}, {"value": 5, "label": "Medium"}, {"value": 6, "label": "High"}]},
+    {"name": "incident_type_ids", "prefix": None, "input_type": "multiselect",
+     "values": [{"value": 19, "label": "Phishing"}, {"value": 21, "label": "Malware"}]},
+    {"name": "source_system", "prefix": "properties", "input_type": "select",
+     "values": [{"value": 301, "label": "SIEM"}, {"value": 302, "label": "EDR"}]},
+]
+
+
+def artifact_fields():
+    return [
+        {"name": "value", "prefix": None, "input_type": "text"},
+        {"name": "type", "prefix": None, "input_type": "select",
+         "values": [{"value": type_id, "label": name} for type_id, name in ARTIFACT_TYPES.items()]},
+    ]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8443)
+    parser.add_argument('--incidents', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--max-page-size', type=int)
+    parser.add_argument('--throttle-every', type=int)
+    parser.add_argument('--certfile', help="PEM file with a certificate and key to serve HTTPS with")
+    args = parser.parse_args()
+    soar = MockSOAR(incidents=args.incidents, latency=args.latency, max_page_size=args.max_page_size,
+                    throttle_every=args.throttle_every, record_requests=False).start(args.port, args.certfile)
+    print("Serving a mock QRadar SOAR organization on {0}/rest/orgs/201".format(soar.url))
+    try:
+        soar.thread.join()
+    except KeyboardInterrupt:
+        soar.stop()
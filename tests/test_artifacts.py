@@ -0,0 +1,31 @@
+import json
+import pytest
+
+
+def test_bulk_add_artifacts_skips_existing_and_duplicates(ops, soar, config):
+    soar.add_incident()
+    soar.add_artifact(1, 1, "10.0.0.1")
+    artifacts = [{"type": "IP Address", "value": "10.0.0.1"}, {"type": "IP Address", "value": "10.0.0.2"},
+                 {"type": {"name": "ip address"}, "value": "10.0.0.2"}, {"type": "DNS Name", "value": "example.com"}]
+    summary = ops.bulk_add_artifacts(config, {"incident_id": 1, "artifacts": artifacts})
+    assert (summary["total"], summary["created"], summary["skipped"]) == (4, 2, 2)
+    assert sorted(a["value"] for a in soar.artifacts[1]) == ["10.0.0.1", "10.0.0.2", "example.com"]
+
+
+def test_bulk_add_artifacts_matches_type_ids(ops, soar, config):
+    soar.add_incident()
+    soar.add_artifact(1, 1, "10.0.0.1")
+    soar.add_artifact(1, 2, "example.com")
+    artifacts = [{"type": 1, "value": "10.0.0.1"}, {"type": {"id": 2}, "value": "example.com"},
+                 {"type": "3", "value": "https://example.com"}, {"type": "URL", "value": "https://example.com"}]
+    summary = ops.bulk_add_artifacts(config, {"incident_id": 1, "artifacts": artifacts})
+    assert (summary["created"], summary["skipped"]) == (1, 3)
+    assert [a["type"] for a in soar.artifacts[1]] == [1, 2, 3]
+    assert [json.loads(r[4])["type"] for r in soar.requests_to('POST', r'/artifacts$')] == [{"name": "URL"}]
+
+
+def test_bulk_add_artifacts_rejects_unknown_type_ids(ops, soar, config):
+    soar.add_incident()
+    with pytest.raises(ops.ConnectorError, match='99'):
+        ops.bulk_add_artifacts(config, {"incident_id": 1, "artifacts": [{"type": 99, "value": "x"}]})
+    assert soar.artifacts.get(1) is None
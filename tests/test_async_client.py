@@ -0,0 +1,59 @@
+import importlib, logging, socket
+import pytest
+
+
+@pytest.fixture
+def async_config(config):
+    pytest.importorskip('httpx')
+    return dict(config, use_async_client=True)
+
+
+def populate(soar, incidents=3):
+    for incident_id in range(1, incidents + 1):
+        soar.add_incident()
+        soar.tasks[incident_id] = [{"id": incident_id * 10, "name": "Task"}]
+        soar.comments[incident_id] = [{"id": incident_id * 10, "text": "Note"}]
+        soar.add_artifact(incident_id, 1, "10.0.0.{0}".format(incident_id))
+        soar.add_attachment(incident_id, b"x" * 10, "file.bin")
+
+
+def test_get_all_incident_details_matches_the_threaded_client(ops, soar, config, async_config):
+    populate(soar)
+    expected = ops.get_all_incident_details(config, {"incidentID": 2})
+    requests_before = len(soar.requests)
+    assert ops.get_all_incident_details(async_config, {"incidentID": 2}) == expected
+    assert len(soar.requests) - requests_before == len(ops.INCIDENT_SECTIONS)
+
+
+def test_get_multiple_incident_details_matches_the_threaded_client(ops, soar, config, async_config):
+    populate(soar)
+    params = {"incident_ids": "1,2,3"}
+    expected = ops.get_multiple_incident_details(config, dict(params))
+    assert ops.get_multiple_incident_details(async_config, dict(params)) == expected
+    assert set(expected) == {"1", "2", "3"}
+
+
+def test_async_client_shares_retries_and_metrics(ops, soar, async_config, caplog):
+    metrics = importlib.import_module(ops.__package__ + '.metrics')
+    metrics.reset()
+    populate(soar, incidents=1)
+    soar.fail(count=1, status=503, path='/tasks')
+    with caplog.at_level(logging.WARNING):
+        result = ops.get_all_incident_details(dict(async_config, enable_metrics=True), {"incidentID": 1})
+    assert "errors" not in result
+    assert any("returned 503, retrying" in record.getMessage() for record in caplog.records)
+    snapshot = metrics.snapshot()
+    histograms = {h["name"] for h in snapshot["histograms"]}
+    assert {"request_duration_seconds", "server_response_seconds", "json_decode_seconds"} <= histograms
+    assert [c["value"] for c in snapshot["counters"] if c["name"] == "http_retries_total"] == [1]
+
+
+def test_async_client_warns_when_retrying_connection_errors(ops, async_config, caplog):
+    with socket.socket() as unused:
+        unused.bind(('127.0.0.1', 0))
+        port = unused.getsockname()[1]
+    config = dict(async_config, server_url='http://127.0.0.1:{0}'.format(port))
+    with caplog.at_level(logging.WARNING), pytest.raises(ops.ConnectorError):
+        ops.get_all_incident_details(config, {"incidentID": 1})
+    retries = [r for r in caplog.records if "failed with ConnectError, retrying" in r.getMessage()]
+    assert len(retries) == ops.MAX_RETRIES * len(ops.INCIDENT_SECTIONS)
@@ -0,0 +1,147 @@
+import hashlib, importlib, multiprocessing, os, sys
+import pytest
+
+
+def test_attachments_are_downloaded(ops, soar, config):
+    soar.add_incident()
+    soar.add_attachment(1, b"a" * 5000, "one.bin")
+    soar.add_attachment(1, b"b" * 3000, "two.bin")
+    result = ops.get_incident_attachment_details(config, {"incidentID": 1})
+    sizes = {a["attachment_name"]: os.path.getsize(a["file_path"]) for a in result["attachments"]}
+    assert sizes == {"one.bin": 5000, "two.bin": 3000}
+    assert "failed_attachments" not in result
+
+
+def test_interrupted_download_is_resumed_from_the_store(ops, soar, config):
+    soar.add_incident()
+    content = os.urandom(3 * 1024 * 1024)
+    meta = soar.add_attachment(1, content, "large.bin")
+    soar.drop_after(meta["id"], 1024 * 1024)
+    result = ops.get_incident_attachment_details(config, {"incidentID": 1, "use_attachment_store": True})
+    with open(result["attachments"][0]["file_path"], 'rb') as f:
+        assert f.read() == content
+    ranges = [r[3].get('Range') for r in soar.requests_to('GET', r'/contents$')]
+    assert ranges[0] is None and ranges[1].startswith('bytes=') and ranges[1] != 'bytes=0-'
+
+    again = ops.get_incident_attachment_details(config, {"incidentID": 1, "use_attachment_store": True})
+    assert again["attachments"][0]["from_store"] is True
+    assert len(soar.requests_to('GET', r'/contents$')) == 2
+
+
+def test_corrupted_blob_is_downloaded_again(ops, soar, config):
+    attachment_store = importlib.import_module(ops.__package__ + '.attachment_store')
+    soar.add_incident()
+    soar.add_attachment(1, b"original contents", "file.txt")
+    params = {"incidentID": 1, "use_attachment_store": True}
+    first = ops.get_incident_attachment_details(config, dict(params))["attachments"][0]
+    blob = os.path.join(ops.ATTACHMENT_STORE_DIR, 'blobs', hashlib.sha256(b"original contents").hexdigest())
+    os.remove(first["file_path"])
+    with open(blob, 'wb') as f:
+        f.write(b"damaged contents!")
+    # Another worker process has not checked the blob yet
+    attachment_store._verified.clear()
+    again = ops.get_incident_attachment_details(config, dict(params))["attachments"][0]
+    assert again["from_store"] is False
+    with open(again["file_path"], 'rb') as f:
+        assert f.read() == b"original contents"
+    assert len(soar.requests_to('GET', r'/contents$')) == 2
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="fork and flock are POSIX only")
+def test_store_is_shared_safely_between_processes(ops, soar, config):
+    soar.add_incident()
+    content = os.urandom(2 * 1024 * 1024)
+    soar.add_attachment(1, content, "shared.bin")
+    soar.latency = 0.3
+    params = {"incidentID": 1, "use_attachment_store": True}
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=ops.get_incident_attachment_details, args=(config, dict(params)))
+               for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    assert [worker.exitcode for worker in workers] == [0, 0, 0]
+    assert len(soar.requests_to('GET', r'/contents$')) == 1
+    blobs = os.listdir(os.path.join(ops.ATTACHMENT_STORE_DIR, 'blobs'))
+    assert blobs == [hashlib.sha256(content).hexdigest()]
+
+
+def test_partial_failures_are_reported(ops, soar, config):
+    soar.add_incident()
+    soar.add_attachment(1, b"a" * 10, "small.bin")
+    soar.add_attachment(1, b"b" * (2 * 1024 * 1024), "large.bin")
+    result = ops.get_incident_attachment_details(config, {"incidentID": 1, "max_file_size": 1})
+    assert [a["attachment_name"] for a in result["attachments"]] == ["small.bin"]
+    assert [a["attachment_name"] for a in result["failed_attachments"]] == ["large.bin"]
+
+
+def test_action_fails_when_every_download_fails(ops, soar, config):
+    soar.add_incident()
+    soar.add_attachment(1, b"a" * 10, "one.bin")
+    soar.add_attachment(1, b"b" * 10, "two.bin")
+    soar.fail(count=2, status=404, path='/contents')
+    with pytest.raises(ops.ConnectorError, match='one.bin: 404.*two.bin: 404'):
+        ops.get_incident_attachment_details(config, {"incidentID": 1})
+
+
+def write_file(directory, name, content):
+    path = os.path.join(str(directory), name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def uploaded_contents(soar, incident_id):
+    return {meta["name"]: content for meta, content in soar.attachments.get(incident_id, {}).values()}
+
+
+def test_upload_streams_the_file(ops, soar, config, tmp_path, monkeypatch):
+    soar.add_incident()
+    content = os.urandom(3 * 1024 * 1024)
+    path = write_file(tmp_path, "large.bin", content)
+    reads = []
+    read = ops.MultipartFileStream.read
+
+    def recording_read(self, size=-1):
+        chunk = read(self, size)
+        reads.append(len(chunk))
+        return chunk
+
+    monkeypatch.setattr(ops.MultipartFileStream, 'read', recording_read)
+    result = ops.upload_incident_attachments(config, {"incident_id": 1, "file_paths": [path]})
+    assert uploaded_contents(soar, 1) == {"large.bin": content}
+    assert result["total_bytes"] == len(content) and "failed" not in result
+    assert max(reads) < len(content) and sum(reads) > len(content)
+    headers = soar.requests_to('POST', r'/attachments$')[0][3]
+    assert int(headers['Content-Length']) == sum(reads)
+
+
+def test_upload_is_sent_again_from_the_start_after_429(ops, soar, config, tmp_path):
+    soar.add_incident()
+    content = os.urandom(256 * 1024)
+    path = write_file(tmp_path, "evidence.bin", content)
+    soar.fail(count=1, status=429, path='/attachments', method='POST')
+    result = ops.upload_incident_attachments(config, {"incident_id": 1, "file_paths": [path]})
+    assert len(soar.requests_to('POST', r'/attachments$')) == 2
+    assert uploaded_contents(soar, 1) == {"evidence.bin": content}
+    assert result["total_bytes"] == len(content)
+
+
+def test_upload_reports_partial_failures(ops, soar, config, tmp_path):
+    soar.add_incident()
+    paths = [write_file(tmp_path, name, name.encode() * 100) for name in ("one.bin", "two.bin")]
+    soar.fail(count=1, status=500, path='/attachments', method='POST')
+    result = ops.upload_incident_attachments(config, {"incident_id": 1, "file_paths": paths,
+                                                      "max_concurrent_uploads": 1})
+    assert [item["file_path"] for item in result["failed"]] == [paths[0]]
+    assert [item["file_path"] for item in result["uploaded"]] == [paths[1]]
+    assert list(uploaded_contents(soar, 1)) == ["two.bin"]
+
+
+def test_upload_fails_when_every_file_fails(ops, soar, config, tmp_path):
+    soar.add_incident()
+    paths = [write_file(tmp_path, name, b"x" * 100) for name in ("one.bin", "two.bin")]
+    soar.fail(count=2, status=500, path='/attachments', method='POST')
+    with pytest.raises(ops.ConnectorError, match='one.bin: 500.*two.bin: 500'):
+        ops.upload_incident_attachments(config, {"incident_id": 1, "file_paths": paths})
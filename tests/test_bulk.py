@@ -0,0 +1,71 @@
+import pytest
+
+
+def test_bulk_close_by_ids_reports_each_incident(ops, soar, config):
+    soar.add_incident(resolution_id=1, resolution_summary="done")
+    soar.add_incident(plan_status="C")
+    soar.add_incident()
+    summary = ops.bulk_close_incidents(config, {"incident_ids": "1,2,3,99"})
+    assert summary["succeeded"] == ["1"]
+    assert summary["skipped"] == {"2": "Incident is already closed.", "3": ops.CLOSE_RESOLUTION_REQUIRED}
+    assert summary["failed"] == {"99": "Incident not found"}
+    assert summary["total"] == 4
+    assert soar.incidents[1]["plan_status"] == "C"
+
+
+def test_bulk_close_by_filter_closes_every_match(ops, soar, config):
+    for _ in range(250):
+        soar.add_incident(resolution_id=1, resolution_summary="done")
+    filters = [{"conditions": [{"field_name": "plan_status", "method": "equals", "value": "A"}]}]
+    summary = ops.bulk_close_incidents(config, {"filters": filters, "concurrency": 4})
+    assert len(summary["succeeded"]) == 250
+    assert all(incident["plan_status"] == "C" for incident in soar.incidents.values())
+
+
+def test_bulk_update_retries_conflicts(ops, soar, config):
+    soar.add_incident()
+    soar.add_incident()
+
+    def modify_once(method, path, body):
+        if method == 'POST' and path == '/incidents/query_paged' and soar.incidents[2]["vers"] == 1:
+            soar.modify_incident(2, name="edited elsewhere")
+
+    soar.hooks.append(modify_once)
+    changes = [{"field": "severity_code", "new_value": {"id": 6}}]
+    summary = ops.bulk_update_incidents(config, {"incident_ids": [1, 2], "changes": changes})
+    assert sorted(summary["succeeded"]) == ["1", "2"]
+    assert soar.incidents[2]["name"] == "edited elsewhere"
+    assert soar.incidents[2]["properties"]["severity_code"] == 6
+    assert len(soar.requests_to('PATCH', r'/incidents/2$')) == 2
+
+
+def test_bulk_close_by_filter_does_not_skip_pages(ops, soar, config, monkeypatch):
+    # Closed incidents drop out of the filter while the remaining pages are still to be read
+    monkeypatch.setattr(ops, 'BULK_FETCH_BATCH_SIZE', 10)
+    for _ in range(1200):
+        soar.add_incident(resolution_id=1, resolution_summary="done")
+    filters = [{"conditions": [{"field_name": "plan_status", "method": "equals", "value": "A"}]}]
+    summary = ops.bulk_close_incidents(config, {"filters": filters})
+    assert len(summary["succeeded"]) == 1200
+    assert [i["id"] for i in soar.incidents.values() if i["plan_status"] != "C"] == []
+
+
+def test_bulk_close_rejects_filters_without_conditions(ops, soar, config):
+    soar.add_incident(resolution_id=1, resolution_summary="done")
+    template = [{"conditions": [{"method": "", "field_name": "", "value": {}, "value_type": "", "type": "",
+                                 "evaluation_id": ""}], "logic_type": "", "type_handle": {"name": "", "id": {}}}]
+    for filters in (template, [{}], [{"conditions": [{"field_name": "plan_status", "value": "A"}]}]):
+        with pytest.raises(ops.ConnectorError):
+            ops.bulk_close_incidents(config, {"filters": filters})
+    assert soar.requests_to('PATCH', '') == []
+    assert soar.incidents[1]["plan_status"] == "A"
+
+
+def test_bulk_close_drops_empty_filter_groups(ops, soar, config):
+    soar.add_incident(resolution_id=1, resolution_summary="done", severity_code=6)
+    soar.add_incident(resolution_id=1, resolution_summary="done", severity_code=4)
+    filters = [{"conditions": [{"field_name": "severity_code", "method": "equals", "value": 6}]},
+               {"conditions": [{"method": "", "field_name": "", "value": {}}]}]
+    summary = ops.bulk_close_incidents(config, {"filters": filters})
+    assert summary["succeeded"] == ["1"]
+    assert soar.incidents[2]["plan_status"] == "A"
@@ -0,0 +1,30 @@
+import pytest
+
+
+def test_health_check_separates_connection_setup_and_is_cached(ops, soar, config):
+    soar.latency = 0.05
+    result = ops.check_health(config)
+    assert set(result) == {"probe", "connect_seconds", "server_response_seconds", "total_seconds", "cached"}
+    assert result["probe"] == "Organization" and result["cached"] is False
+    assert result["server_response_seconds"] >= 0.05
+    assert result["total_seconds"] >= result["connect_seconds"] + result["server_response_seconds"] - 0.01
+    assert ops.check_health(config)["cached"] is True
+    assert [r[1] for r in soar.requests] == ['/rest/orgs/201', '/rest/orgs/201']
+    # The probe runs on its own session and leaves the shared pool alone
+    assert all(key[0] != ops.IBMResilient(config).url for key in ops._sessions)
+
+
+def test_failed_health_check_is_not_cached(ops, soar, config):
+    config = dict(config, health_check_probe="Simulations")
+    soar.fail(count=1, status=401, retry_after=None)
+    with pytest.raises(ops.ConnectorError, match='401'):
+        ops.check_health(config)
+    assert ops.check_health(config)["cached"] is False
+    assert soar.requests_to('GET', r'/incidents/simulations$')[-1][2] == {"want_closed": "True"}
+
+
+def test_changed_secret_is_checked_again(ops, soar, config):
+    soar.credentials = ("key", "secret")
+    assert ops.check_health(config)["cached"] is False
+    with pytest.raises(ops.ConnectorError, match='401'):
+        ops.check_health(dict(config, api_secret="wrong"))
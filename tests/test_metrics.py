@@ -0,0 +1,29 @@
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request_count(metrics):
+    return sum(c["value"] for c in metrics.snapshot()["counters"] if c["name"] == "requests_total")
+
+
+def test_metrics_follow_the_configuration_of_each_call(ops, soar, config):
+    metrics = importlib.import_module(ops.__package__ + '.metrics')
+    connector = importlib.import_module(ops.__package__ + '.connector').IBMResilient()
+    metrics.reset()
+    soar.add_incident()
+    enabled = dict(config, enable_metrics=True)
+    disabled = dict(config, enable_metrics=False)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda c: connector.execute(c, 'get_incident_details', {"incident_id": 1}),
+                          [enabled, disabled] * 20))
+    assert request_count(metrics) == 20
+    operations_total = [c for c in metrics.snapshot()["counters"] if c["name"] == "operations_total"]
+    assert [c["value"] for c in operations_total] == [20]
+
+    metrics.reset()
+    connector.check_health(disabled)
+    assert metrics.snapshot() == {"counters": [], "histograms": []}
+    ops._health_cache.clear()
+    connector.check_health(enabled)
+    names = {h["name"] for h in metrics.snapshot()["histograms"]}
+    assert "health_check_seconds" in names
@@ -0,0 +1,148 @@
+import json
+import pytest
+
+
+def query_bodies(soar, path='/incidents/query_paged'):
+    return [r for r in soar.requests if r[0] == 'POST' and r[1].endswith(path)]
+
+
+def test_search_incidents_pages_through_every_record(ops, soar, config):
+    for _ in range(250):
+        soar.add_incident()
+    records = ops.search_incidents(config, {"length": 100, "sorts": [{"field_name": "id", "type": "asc"}]})
+    assert [r["id"] for r in records] == list(range(1, 251))
+    assert len(query_bodies(soar)) == 3
+
+
+def test_search_incidents_concurrent_pages_keep_order(ops, soar, config):
+    for _ in range(230):
+        soar.add_incident()
+    records = ops.search_incidents(config, {"length": 20, "concurrent_pages": 4,
+                                            "sorts": [{"field_name": "id", "type": "asc"}]})
+    assert [r["id"] for r in records] == list(range(1, 231))
+
+
+def test_search_incidents_stops_at_max_records(ops, soar, config):
+    for _ in range(500):
+        soar.add_incident()
+    records = ops.search_incidents(config, {"length": 100, "max_records": 150})
+    assert len(records) == 150
+    assert len(query_bodies(soar)) == 2
+
+
+def test_search_incidents_projects_fields(ops, soar, config):
+    soar.add_incident(name="first")
+    records = ops.search_incidents(config, {"fields": "id,name"})
+    assert records == [{"id": 1, "name": "first"}]
+
+
+def test_incident_sections_are_combined(ops, soar, config):
+    incident = soar.add_incident()
+    soar.tasks[incident["id"]] = [{"id": 7, "name": "Investigate"}]
+    soar.comments[incident["id"]] = [{"id": 8, "text": "note"}]
+    soar.add_artifact(incident["id"], 1, "10.0.0.1")
+    soar.add_attachment(incident["id"], b"contents", "evidence.txt")
+    details = ops.get_all_incident_details(config, {"incidentID": incident["id"]})
+    assert details["tasks"] == [{"id": 7, "name": "Investigate"}]
+    assert details["notes"] == [{"id": 8, "text": "note"}]
+    assert [a["value"] for a in details["artifacts"]["data"]] == ["10.0.0.1"]
+    assert [a["name"] for a in details["attachments"]] == ["evidence.txt"]
+    assert "errors" not in details
+
+
+def test_sync_incidents_returns_only_changes(ops, soar, config):
+    for _ in range(5):
+        soar.add_incident()
+    first = ops.sync_incidents(config, {"clock_skew": 0})
+    assert first["count"] == 5
+    assert ops.sync_incidents(config, {"clock_skew": 0})["count"] == 0
+    soar.modify_incident(3, name="changed")
+    soar.add_incident()
+    second = ops.sync_incidents(config, {"clock_skew": 0})
+    assert sorted(r["id"] for r in second["incidents"]) == [3, 6]
+    assert json.loads(json.dumps(second["checkpoint"]))["last_modified"] == soar.clock
+
+
+def test_max_records_limits_requested_lengths(ops, soar, config):
+    for _ in range(500):
+        soar.add_incident()
+    records = ops.search_incidents(config, {"length": 100, "max_records": 150, "concurrent_pages": 4})
+    assert len(records) == 150
+    lengths = [json.loads(r[4])["length"] for r in query_bodies(soar)]
+    assert lengths == [100, 50]
+    assert len(ops.search_incidents(config, {"length": 100, "max_records": 30})) == 30
+    assert json.loads(query_bodies(soar)[-1][4])["length"] == 30
+
+
+def test_sync_does_not_skip_incidents_modified_during_the_sync(ops, soar, config):
+    for _ in range(50):
+        soar.add_incident()
+
+    def modify_read_incidents(method, path, body):
+        # Every page moves an incident that was already returned to the end of the sort order
+        if method == 'POST' and path == '/incidents/query_paged':
+            soar.modify_incident(len(query_bodies(soar)), name="edited during sync")
+
+    soar.hooks.append(modify_read_incidents)
+    result = ops.sync_incidents(config, {"length": 10, "clock_skew": 0})
+    assert set(r["id"] for r in result["incidents"]) == set(range(1, 51))
+    assert all(json.loads(r[4]).get("start", 0) == 0 for r in query_bodies(soar))
+
+
+def test_sync_pages_through_ties(ops, soar, config):
+    for _ in range(25):
+        soar.add_incident(inc_last_modified_date=5)
+    result = ops.sync_incidents(config, {"length": 10, "clock_skew": 0, "reset_checkpoint": True})
+    assert sorted(r["id"] for r in result["incidents"]) == list(range(1, 26))
+    assert len(query_bodies(soar)) == 3
+
+
+def test_sync_honours_zero_clock_skew(ops, soar, config):
+    for _ in range(3):
+        soar.add_incident()
+    ops.sync_incidents(config, {"clock_skew": 0})
+    soar.add_incident()
+    ops.sync_incidents(config, {"clock_skew": 0})
+    condition = json.loads(query_bodies(soar)[-1][4])["filters"][0]["conditions"][0]
+    assert condition == {"field_name": "inc_last_modified_date", "method": "gte", "value": soar.clock - 1}
+
+
+def test_sync_keeps_cursor_conditions_with_any_logic(ops, soar, config):
+    for i in range(30):
+        soar.add_incident(severity_code=4 + i % 3, plan_status='A' if i % 2 else 'C')
+    filters = [{"conditions": [{"field_name": "severity_code", "method": "equals", "value": 4},
+                               {"field_name": "plan_status", "method": "equals", "value": "A"}]}]
+    params = {"filters": filters, "logic_type": "any", "length": 5, "clock_skew": 0}
+    result = ops.sync_incidents(config, params)
+    expected = {r["id"] for r in soar.incidents.values() if r["severity_code"] == 4 or r["plan_status"] == 'A'}
+    assert sorted(r["id"] for r in result["incidents"]) == sorted(expected)
+    for request in query_bodies(soar):
+        body = json.loads(request[4])
+        assert body["logic_type"] == 'all' and all(f["logic_type"] == 'all' for f in body["filters"])
+    assert ops.sync_incidents(config, params)["count"] == 0
+
+
+@pytest.mark.parametrize("concurrent_pages", [1, 4])
+def test_search_reads_every_record_when_the_server_caps_the_page_size(ops, soar, config, concurrent_pages):
+    for _ in range(230):
+        soar.add_incident()
+    soar.max_page_size = 50
+    records = ops.search_incidents(config, {"length": 100, "concurrent_pages": concurrent_pages})
+    assert [r["id"] for r in records] == list(range(1, 231))
+    starts = sorted(json.loads(r[4])["start"] for r in query_bodies(soar))
+    assert starts == list(range(0, 230, 50))
+    assert len(ops.search_incidents(config, {"length": 100, "max_records": 120,
+                                             "concurrent_pages": concurrent_pages})) == 120
+
+
+def test_search_recovers_when_the_page_size_cap_appears_mid_stream(ops, soar, config):
+    for _ in range(500):
+        soar.add_incident()
+
+    def cap_after_first_page(method, path, body):
+        if path.endswith('/query_paged'):
+            soar.max_page_size = 30
+
+    soar.hooks.append(cap_after_first_page)
+    records = ops.search_incidents(config, {"length": 100, "concurrent_pages": 4})
+    assert [r["id"] for r in records] == list(range(1, 501))
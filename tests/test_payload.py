@@ -0,0 +1,8 @@
+def test_check_payload_cleans_objects_inside_lists(ops):
+    payload = {"name": "x", "owner_id": None, "plan_status": "", "properties": {"a": "", "b": {"c": None}},
+               "artifacts": [{"value": "1.2.3.4", "description": ""}, {"description": None}, "", []],
+               "tags": []}
+    assert ops.check_payload(payload) == {"name": "x", "artifacts": [{"value": "1.2.3.4"}, "", []], "tags": []}
+    filters = [{"conditions": [{"field_name": "id", "method": "in", "value": [1, 2]}], "logic_type": ""}, {}]
+    assert ops.check_payload(filters) == [{"conditions": [{"field_name": "id", "method": "in", "value": [1, 2]}]}]
+    assert payload["properties"] == {"a": "", "b": {"c": None}}
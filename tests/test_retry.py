@@ -0,0 +1,67 @@
+import time
+import pytest
+
+
+def test_rate_limited_request_is_retried(ops, soar, config):
+    soar.add_incident()
+    soar.fail(count=2, status=429)
+    assert ops.get_incident_details(config, {"incident_id": 1})["id"] == 1
+    assert len(soar.requests_to('GET', r'/incidents/1$')) == 3
+
+
+def test_rate_limited_post_is_retried(ops, soar, config):
+    soar.add_incident()
+    soar.fail(count=1, status=429, path='/artifacts')
+    ops.bulk_add_artifacts(config, {"incident_id": 1, "artifacts": [{"type": "IP Address", "value": "10.0.0.1"}]})
+    assert [a["value"] for a in soar.artifacts[1]] == ["10.0.0.1"]
+
+
+def test_query_paged_is_retried_on_unavailable(ops, soar, config):
+    soar.add_incident()
+    soar.fail(count=1, status=503, path='/query_paged')
+    assert len(ops.search_incidents(config, {})) == 1
+
+
+def test_unavailable_patch_is_not_repeated(ops, soar, config):
+    soar.add_incident(resolution_id=1, resolution_summary="done")
+    soar.fail(count=1, status=503, path='/incidents/1', method='PATCH')
+    with pytest.raises(ops.ConnectorError, match='503'):
+        ops.close_incident(config, {"incident_id": 1, "optimistic_update": False})
+    assert len(soar.requests_to('PATCH', r'/incidents/1$')) == 1
+
+
+def test_retries_are_bounded(ops, soar, config):
+    soar.add_incident()
+    soar.fail(count=ops.MAX_RETRIES + 1, status=429)
+    with pytest.raises(ops.ConnectorError, match='429'):
+        ops.get_incident_details(config, {"incident_id": 1})
+    assert len(soar.requests) == ops.MAX_RETRIES + 1
+
+
+def test_cached_reads_are_invalidated_by_changes(ops, soar, config):
+    soar.add_incident(resolution_id=1, resolution_summary="done")
+    config = dict(config, cache_ttl=60)
+    assert ops.get_incident_details(config, {"incident_id": 1})["plan_status"] == "A"
+    assert ops.get_incident_details(config, {"incident_id": 1})["plan_status"] == "A"
+    assert len(soar.requests_to('GET', r'/incidents/1$')) == 1
+    ops.close_incident(config, {"incident_id": 1})
+    assert ops.get_incident_details(config, {"incident_id": 1})["plan_status"] == "C"
+
+
+def test_rate_limit_is_off_by_default(ops, soar, config):
+    soar.add_incident()
+    started = time.monotonic()
+    for _ in range(60):
+        ops.get_incident_details(config, {"incident_id": 1})
+    assert time.monotonic() - started < 1.5
+    assert ops._token_buckets == {}
+
+
+def test_rate_limit_spaces_requests_beyond_the_burst(ops, soar, config):
+    soar.add_incident()
+    config = dict(config, rate_limit=20)
+    started = time.monotonic()
+    for _ in range(50):
+        ops.get_incident_details(config, {"incident_id": 1})
+    # 40 requests fit in the burst, the other 10 wait for tokens at 20 per second
+    assert time.monotonic() - started >= 0.45
@@ -0,0 +1,66 @@
+import pytest
+
+
+def severity_change(new, old=None):
+    change = {"field": "severity_code", "new_value": {"id": new}}
+    if old is not None:
+        change["old_value"] = {"id": old}
+    return change
+
+
+def test_optimistic_update_skips_the_read(ops, soar, config):
+    soar.add_incident(severity_code=4)
+    ops.update_incident(config, {"incident_id": 1, "optimistic_update": True, "changes": [severity_change(5, 4)]})
+    assert soar.incidents[1]["severity_code"] == 5
+    assert soar.requests_to('GET', '') == []
+    assert len(soar.requests_to('PATCH', r'/incidents/1$')) == 1
+
+
+def test_optimistic_update_refreshes_cached_old_values_on_conflict(ops, soar, config):
+    soar.add_incident(severity_code=4)
+    config = dict(config, cache_ttl=60)
+    ops.get_incident_details(config, {"incident_id": 1})
+    soar.modify_incident(1, severity_code=6)
+    ops.update_incident(config, {"incident_id": 1, "optimistic_update": True, "changes": [severity_change(5)]})
+    assert soar.incidents[1]["severity_code"] == 5
+    assert len(soar.requests_to('PATCH', r'/incidents/1$')) == 2
+
+
+def test_optimistic_update_keeps_caller_old_values(ops, soar, config):
+    soar.add_incident(severity_code=4)
+    soar.modify_incident(1, severity_code=6)
+    with pytest.raises(ops.ConnectorError, match='409'):
+        ops.update_incident(config, {"incident_id": 1, "optimistic_update": True,
+                                     "changes": [severity_change(5, 4)]})
+    # The concurrent change is not overwritten
+    assert soar.incidents[1]["severity_code"] == 6
+    assert len(soar.requests_to('PATCH', r'/incidents/1$')) == 1
+
+
+def test_optimistic_update_retries_when_caller_old_values_still_hold(ops, soar, config):
+    soar.add_incident(severity_code=4)
+    config = dict(config, cache_ttl=60)
+    ops.get_incident_details(config, {"incident_id": 1})
+    soar.modify_incident(1, name="renamed")
+    ops.update_incident(config, {"incident_id": 1, "optimistic_update": True, "changes": [severity_change(5, 4)]})
+    assert soar.incidents[1]["severity_code"] == 5
+    assert soar.incidents[1]["name"] == "renamed"
+
+
+def test_optimistic_update_keeps_caller_version(ops, soar, config):
+    soar.add_incident(severity_code=4)
+    soar.modify_incident(1, name="renamed")
+    with pytest.raises(ops.ConnectorError, match='409'):
+        ops.update_incident(config, {"incident_id": 1, "optimistic_update": True, "version": 1,
+                                     "changes": [severity_change(5)]})
+    assert soar.incidents[1]["severity_code"] == 4
+
+
+def test_optimistic_close(ops, soar, config):
+    soar.add_incident(resolution_id=1, resolution_summary="done")
+    soar.add_incident()
+    ops.close_incident(config, {"incident_id": 1, "optimistic_update": True})
+    assert soar.incidents[1]["plan_status"] == "C"
+    assert soar.requests_to('GET', '') == []
+    assert ops.close_incident(config, {"incident_id": 2, "optimistic_update": True}) == ops.CLOSE_RESOLUTION_REQUIRED
+    assert soar.incidents[2]["plan_status"] == "A"
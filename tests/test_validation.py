@@ -0,0 +1,55 @@
+import json
+import pytest
+
+
+def create(ops, config, additional_fields):
+    return ops.create_incident(config, {"name": "Validated", "validate_fields": True,
+                                        "additional_fields": additional_fields})
+
+
+def test_create_resolves_select_labels_to_ids(ops, soar, config):
+    create(ops, config, {"severity_code": "high", "plan_status": "Active", "incident_type_ids": ["Phishing", 21],
+                         "properties": {"source_system": "EDR"}})
+    body = json.loads(soar.requests_to('POST', r'/incidents$')[0][4])
+    assert body["severity_code"] == 6 and body["plan_status"] == "A"
+    assert body["incident_type_ids"] == [19, 21]
+    assert body["properties"] == {"source_system": 302}
+    create(ops, config, {"severity_code": 5})
+    assert len(soar.requests_to('GET', r'/types/incident/fields$')) == 1
+
+
+def test_create_rejects_unknown_fields_and_values_without_posting(ops, soar, config):
+    with pytest.raises(ops.ConnectorError) as error:
+        create(ops, config, {"severity": "High", "severity_code": "Critical", "incident_type_ids": ["Spam"],
+                             "properties": {"ticket": "1"}})
+    message = str(error.value)
+    for problem in ("Unknown field 'severity'", "'Critical' is not a valid value for field 'severity_code'",
+                    "'Spam' is not a valid value for field 'incident_type_ids'", "Unknown custom field 'ticket'"):
+        assert problem in message
+    assert soar.requests_to('POST', r'/incidents$') == []
+
+
+def test_update_resolves_select_labels_to_ids(ops, soar, config):
+    soar.add_incident(severity_code=4, incident_type_ids=[19], properties={"source_system": 301})
+    changes = [{"field": {"name": "severity_code"}, "old_value": {"text": "Low"}, "new_value": {"text": "High"}},
+               {"field": {"name": "incident_type_ids"}, "new_value": {"texts": ["Phishing", "Malware"]}},
+               {"field": {"name": "source_system"}, "old_value": {"text": "SIEM"}, "new_value": {"text": "edr"}}]
+    ops.update_incident(config, {"incident_id": 1, "changes": changes, "validate_fields": True})
+    body = json.loads(soar.requests_to('PATCH', r'/incidents/1$')[0][4])
+    assert [(c.get("old_value"), c["new_value"]) for c in body["changes"]] == [
+        ({"id": 4}, {"id": 6}), (None, {"ids": [19, 21]}), ({"id": 301}, {"id": 302})]
+    incident = soar.incidents[1]
+    assert (incident["severity_code"], incident["incident_type_ids"]) == (6, [19, 21])
+    assert incident["properties"]["source_system"] == 302
+
+
+@pytest.mark.parametrize("optimistic", [False, True])
+def test_update_rejects_unknown_fields_and_values_without_patching(ops, soar, config, optimistic):
+    soar.add_incident(severity_code=4)
+    changes = [{"field": {"name": "severity"}, "new_value": {"text": "High"}},
+               {"field": {"name": "severity_code"}, "new_value": {"text": "Critical"}}]
+    with pytest.raises(ops.ConnectorError, match="Unknown field 'severity'.*'Critical' is not a valid value"):
+        ops.update_incident(config, {"incident_id": 1, "changes": changes, "validate_fields": True,
+                                     "optimistic_update": optimistic})
+    assert soar.requests_to('PATCH', r'/incidents/1$') == []
+    assert soar.incidents[1]["vers"] == 1